@@ -1,9 +1,4 @@
-import os
-import pandas as pd
-import time
-from azure.identity import AzureCliCredential
-from azure.core.exceptions import ClientAuthenticationError
-from azure.mgmt.keyvault import KeyVaultManagementClient
+from pid_engine import run_policy
 
 # ---------------------
 # 📥 Config
@@ -13,150 +8,15 @@ SHEET_NAME = "Sheet1"
 POLICY_FILTER_VALUE = "123456"
 PARTIAL_OUTPUT_FILE = "keyvault_recoverable_output_partial.xlsx"
 FINAL_OUTPUT_FILE = "keyvault_recoverable_output.xlsx"
-SAVE_EVERY = 100
+SAVE_EVERY = 100  # Save progress every N rows
+MAX_WORKERS = 8  # Parallel Key Vault checks (1 = sequential)
+COLLECTION_MODE = "arm"  # "arm" = per-resource ARM GETs, "graph" = one Resource Graph sweep
 
 # ---------------------
-# 🔐 Azure CLI Login Check
+# 🚀 Run Check (keyvault_recoverable in pid_checks.py)
 # ---------------------
-try:
-    credential = AzureCliCredential()
-    credential.get_token("https://management.azure.com/.default")
-except ClientAuthenticationError:
-    print("⚠️ Azure CLI session expired or not logged in.")
-    print("👉 Please run 'az login' and rerun this script.")
-    exit(1)
-
-# ---------------------
-# ⏱️ Timer Start
-# ---------------------
-start_time = time.time()
-
-# ---------------------
-# 🧾 Load and Filter Input
-# ---------------------
-df = pd.read_excel(INPUT_FILE, sheet_name=SHEET_NAME)
-df.columns = df.columns.str.strip()
-df['Policy ID'] = df['Policy ID'].apply(lambda x: str(x).strip())
-filtered_df = df[df['Policy ID'] == POLICY_FILTER_VALUE.strip()]
-
-print(f"\n📊 Total entries: {len(df)}")
-print(f"🔎 Matching Policy ID '{POLICY_FILTER_VALUE}': {len(filtered_df)}")
-
-if filtered_df.empty:
-    print("⚠️ No matching rows. Exiting.")
-    exit(1)
-
-# ---------------------
-# 🔁 Resume Support
-# ---------------------
-processed_pairs = set()
-results = []
-
-if os.path.exists(PARTIAL_OUTPUT_FILE):
-    partial_df = pd.read_excel(PARTIAL_OUTPUT_FILE)
-    results = partial_df.to_dict(orient='records')
-    for _, row in partial_df.iterrows():
-        key = (row['Key Vault Name'].strip().lower(), row['Subscription ID'].strip().lower())
-        processed_pairs.add(key)
-    print(f"🔁 Resuming from {len(processed_pairs)} processed vaults.")
-
-# ---------------------
-# 📦 Vault Caching
-# ---------------------
-vault_cache = {}
-
-def get_vault_from_cache(client, subscription_id, kv_name):
-    if subscription_id not in vault_cache:
-        print(f"📦 Caching Key Vaults in subscription: {subscription_id}")
-        vault_cache[subscription_id] = list(client.vaults.list())
-    return next((v for v in vault_cache[subscription_id] if v.name.lower() == kv_name.lower()), None)
-
-# ---------------------
-# 🚀 Process Each Vault
-# ---------------------
-filtered_df = filtered_df.reset_index(drop=True)
-total = len(filtered_df)
-processed_count = len(processed_pairs)
-
-for idx, (_, row) in enumerate(filtered_df.iterrows(), start=1):
-    sub_id = str(row['Subscription ID']).strip()
-    kv_name = str(row['Key Vault Name']).strip()
-    pair_key = (kv_name.lower(), sub_id.lower())
-
-    if pair_key in processed_pairs:
-        continue
-
-    print(f"\n🔍 [Processing {processed_count + 1} of {total}] '{kv_name}' in subscription '{sub_id}'")
-
-    entry = {
-        "Index": processed_count + 1,
-        "Subscription ID": sub_id,
-        "Key Vault Name": kv_name,
-        "Resource Group": "",
-        "Soft Delete Enabled?": "",
-        "Purge Protection?": "",
-        "Retention Days": "",
-        "Recoverable?": "",
-        "Status": "",
-        "Message": ""
-    }
-
-    try:
-        client = KeyVaultManagementClient(credential, sub_id)
-        vault_ref = get_vault_from_cache(client, sub_id, kv_name)
-
-        if not vault_ref:
-            entry["Status"] = "Failed"
-            entry["Message"] = "Key Vault not found"
-            print(f"❌ {entry['Message']}")
-        else:
-            rg_parts = vault_ref.id.split('/')
-            rg_name = rg_parts[rg_parts.index('resourceGroups') + 1]
-            vault = client.vaults.get(rg_name, kv_name)
-
-            props = vault.properties
-            soft_delete = props.enable_soft_delete if props.enable_soft_delete is not None else False
-            purge_protect = props.enable_purge_protection if props.enable_purge_protection is not None else False
-            retention_days = props.soft_delete_retention_in_days if props.soft_delete_retention_in_days is not None else "Unknown"
-
-            entry["Resource Group"] = rg_name
-            entry["Soft Delete Enabled?"] = "Yes ✅" if soft_delete else "No ❌"
-            entry["Purge Protection?"] = "Yes ✅" if purge_protect else "No ❌"
-            entry["Retention Days"] = retention_days
-            entry["Recoverable?"] = "Yes ✅" if soft_delete else "No ❌"
-            entry["Status"] = "Success"
-            entry["Message"] = "Processed successfully"
-            print(f"✅ {entry['Message']}")
-
-    except ClientAuthenticationError:
-        print(f"\n⛔ CLI session expired at row {processed_count + 1} → '{kv_name}'")
-        pd.DataFrame(results).to_excel(PARTIAL_OUTPUT_FILE, index=False)
-        print(f"💾 Partial saved → {PARTIAL_OUTPUT_FILE}")
-        print("👉 Run 'az login' and rerun this script.")
-        exit(1)
-    except Exception as e:
-        entry["Status"] = "Failed"
-        entry["Message"] = str(e)
-        print(f"❗ Error: {e}")
-
-    results.append(entry)
-    processed_pairs.add(pair_key)
-    processed_count += 1
-
-    if processed_count % SAVE_EVERY == 0:
-        pd.DataFrame(results).to_excel(PARTIAL_OUTPUT_FILE, index=False)
-        print(f"💾 Saved {processed_count} rows → {PARTIAL_OUTPUT_FILE}")
-
-# ---------------------
-# ✅ Final Save
-# ---------------------
-pd.DataFrame(results).to_excel(FINAL_OUTPUT_FILE, index=False)
-print(f"\n📁 Final output saved to: {FINAL_OUTPUT_FILE}")
-
-# ---------------------
-# ⏱️ Execution Time
-# ---------------------
-elapsed = time.time() - start_time
-h, m, s = int(elapsed // 3600), int((elapsed % 3600) // 60), round(elapsed % 60, 2)
-print(f"\n⏱️ Execution time: {h} hours, {m} minutes, {s} seconds")
-print("✅ All vaults processed.")
+run_policy(
+    "keyvault_recoverable", POLICY_FILTER_VALUE, INPUT_FILE, SHEET_NAME,
+    partial_file=PARTIAL_OUTPUT_FILE, final_file=FINAL_OUTPUT_FILE,
+    save_every=SAVE_EVERY, max_workers=MAX_WORKERS, collection_mode=COLLECTION_MODE,
+)
@@ -1,14 +1,42 @@
 import subprocess
 import json
-import pandas as pd
+import re
+from itertools import groupby
+
+import xlsxwriter
+
+from concurrent_fetch import run_in_order
+from resource_graph import rest_dict
+from resource_index import resource_group_from_id
 
 # ------------------ CONFIGURATION ------------------
 CONFIG = {
     "subscription_id": "your-subscription-id",  # 🔁 Replace with your Azure Subscription ID
+    "subscription_ids": [],  # 🔁 Several subscriptions, or ["all"] for every visible one (overrides subscription_id)
+    "mode": "cli",  # "cli" = az vm list -d, "sdk" = compute/network SDK listings, "graph" = one Resource Graph sweep
+    "max_workers": 8,  # Subscriptions fetched in parallel (cli and sdk modes)
     "output_excel": "Azure_VM_Details.xlsx"
 }
 # ----------------------------------------------------
 
+# Keys the CLI passes through untouched (user tag names, identity resource IDs)
+VERBATIM_KEYS = {"tags", "userAssignedIdentities"}
+
+
+def resolve_subscriptions(mode):
+    subscription_ids = CONFIG["subscription_ids"] or [CONFIG["subscription_id"]]
+    if subscription_ids != ["all"]:
+        return subscription_ids
+    if mode == "graph":
+        return None  # Resource Graph queries every visible subscription
+    if mode == "sdk":
+        from azure.mgmt.resource import SubscriptionClient
+        from arm_clients import get_client
+        return [sub.subscription_id for sub in get_client(SubscriptionClient).subscriptions.list()]
+    cmd = ["az", "account", "list", "--query", "[].id", "--output", "json"]
+    return json.loads(subprocess.run(cmd, capture_output=True, text=True, check=True).stdout)
+
+# ------------------ CLI FETCH ------------------
 def fetch_vm_data(subscription_id):
     print(f"\n🔍 Fetching VM data from subscription: {subscription_id}")
     try:
@@ -26,6 +54,115 @@ def fetch_vm_data(subscription_id):
         print(f"❌ Unexpected error: {str(ex)}")
         return []
 
+# ------------------ SDK / GRAPH → CLI SHAPE ------------------
+def cli_key(rest_key):
+    # The CLI prints SDK attribute names in camelCase, so REST acronyms are
+    # folded: diskSizeGB → diskSizeGb, provisionVMAgent → provisionVmAgent.
+    snake = re.sub(r"([A-Z]+)([A-Z][a-z])", r"\1_\2", rest_key)
+    snake = re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", snake).lower()
+    head, *rest = snake.split("_")
+    return head + "".join(word.capitalize() for word in rest)
+
+
+def cli_keys(value):
+    if isinstance(value, list):
+        return [cli_keys(item) for item in value]
+    if isinstance(value, dict):
+        return {
+            cli_key(key): item if key in VERBATIM_KEYS else cli_keys(item)
+            for key, item in value.items()
+        }
+    return value
+
+
+def build_ip_map(nics, public_ips):
+    # {nic_id_lower: ([private IPs], [public IPs])} from REST-shaped NIC / public IP rows
+    public_by_id = {pip["id"].lower(): pip.get("properties", {}).get("ipAddress") for pip in public_ips}
+    ip_map = {}
+    for nic in nics:
+        private, public = [], []
+        for ip_config in nic.get("properties", {}).get("ipConfigurations", []):
+            props = ip_config.get("properties", {})
+            if props.get("privateIPAddress"):
+                private.append(props["privateIPAddress"])
+            public_id = (props.get("publicIPAddress") or {}).get("id", "").lower()
+            if public_by_id.get(public_id):
+                public.append(public_by_id[public_id])
+        ip_map[nic["id"].lower()] = (private, public)
+    return ip_map
+
+
+def to_cli_shape(vm, ip_map):
+    # Flattens a REST-shaped VM into the `az vm list -d` layout extract_vm_info reads.
+    props = vm.get("properties", {})
+    instance_view = props.get("extended", {}).get("instanceView", {})  # Resource Graph
+    power_state = (instance_view.get("powerState") or {}).get("displayStatus")
+    for status in props.get("instanceView", {}).get("statuses", []):  # list_all(status_only="true")
+        if status.get("code", "").startswith("PowerState/"):
+            power_state = status.get("displayStatus")
+
+    private_ips, public_ips = [], []
+    for nic in props.get("networkProfile", {}).get("networkInterfaces", []):
+        private, public = ip_map.get(nic.get("id", "").lower(), ([], []))
+        private_ips += private
+        public_ips += public
+
+    shaped = cli_keys({key: value for key, value in props.items() if key not in ("instanceView", "extended")})
+    for key in ("id", "name", "location", "zones", "identity"):
+        if vm.get(key) is not None:
+            shaped[key] = cli_keys(vm[key])
+    shaped.update({
+        "resourceGroup": resource_group_from_id(vm["id"]),
+        "tags": vm.get("tags"),
+        "powerState": power_state,
+        "privateIps": ",".join(private_ips),
+        "publicIps": ",".join(public_ips),
+    })
+    return shaped
+
+
+def fetch_vm_data_sdk(subscription_id):
+    # Three paged listings per subscription (VMs with power state, NICs, public
+    # IPs) instead of the CLI's per-VM instance-view and NIC calls. All three
+    # bypass the ARM snapshot cache: power states and IPs must be current.
+    from azure.mgmt.compute import ComputeManagementClient
+    from azure.mgmt.network import NetworkManagementClient
+    from arm_cache import LIVE
+    from arm_clients import get_client
+
+    print(f"\n🔍 Fetching VM data from subscription: {subscription_id}")
+    try:
+        compute = get_client(ComputeManagementClient, subscription_id)
+        network = get_client(NetworkManagementClient, subscription_id)
+        ip_map = build_ip_map(
+            (rest_dict(nic) for nic in network.network_interfaces.list_all(**LIVE)),
+            (rest_dict(pip) for pip in network.public_ip_addresses.list_all(**LIVE)),
+        )
+        vms = compute.virtual_machines.list_all(status_only="true", **LIVE)
+        return [to_cli_shape(rest_dict(vm), ip_map) for vm in vms]
+    except Exception as ex:
+        print(f"❌ SDK error: {str(ex)}")
+        return []
+
+
+def fetch_vm_data_graph(subscription_ids):
+    # Yields (subscription_id, [vm, ...]) one subscription at a time, straight
+    # off the Resource Graph pages.
+    from resource_graph import NETWORK_INTERFACE_QUERY, PUBLIC_IP_QUERY, VIRTUAL_MACHINE_QUERY, query_resource_graph
+
+    def of_type(rows, resource_type):
+        return (row for row in rows if str(row.get("type", "")).lower() == resource_type)
+
+    ip_map = build_ip_map(
+        of_type(query_resource_graph(NETWORK_INTERFACE_QUERY, subscription_ids), "microsoft.network/networkinterfaces"),
+        of_type(query_resource_graph(PUBLIC_IP_QUERY, subscription_ids), "microsoft.network/publicipaddresses"),
+    )
+    vms = of_type(query_resource_graph(VIRTUAL_MACHINE_QUERY, subscription_ids), "microsoft.compute/virtualmachines")
+    for subscription_id, sub_vms in groupby(vms, key=lambda vm: vm["subscriptionId"]):
+        print(f"\n🔍 VM data from Resource Graph for subscription: {subscription_id}")
+        yield subscription_id, [to_cli_shape(vm, ip_map) for vm in sub_vms]
+
+# ------------------ EXTRACT AND SAVE ------------------
 def extract_vm_info(vm_list, subscription_id):
     print(f"📦 Extracting details for {len(vm_list)} VM(s)...")
     extracted = []
@@ -67,25 +204,64 @@ def extract_vm_info(vm_list, subscription_id):
         })
     return extracted
 
-def save_to_excel(data, output_file):
-    print(f"💾 Saving results to Excel: {output_file}")
-    df = pd.DataFrame(data)
-    df.to_excel(output_file, index=False)
-    print(f"✅ Export complete! {len(df)} VM entries written.\n")
+
+class ExcelRowSink:
+    # Streams rows into the workbook as each subscription completes
+    # (xlsxwriter constant_memory), so the estate is never held in memory.
+    # The workbook is created with the first row, so no rows means no file.
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.workbook = None
+        self.columns = None
+        self.count = 0
+
+    def write(self, rows):
+        for row in rows:
+            if self.columns is None:
+                self.columns = list(row)
+                self.workbook = xlsxwriter.Workbook(self.output_file, {"constant_memory": True})
+                self.worksheet = self.workbook.add_worksheet("Sheet1")
+                header_format = self.workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+                self.worksheet.write_row(0, 0, self.columns, header_format)
+            self.count += 1
+            self.worksheet.write_row(self.count, 0, [row.get(column) for column in self.columns])
+
+    def close(self):
+        if self.workbook is not None:
+            self.workbook.close()
+        return self.count
+
+
+def fetch_all(mode, subscription_ids):
+    # Yields (subscription_id, vm_list) in subscription order.
+    if mode == "graph":
+        yield from fetch_vm_data_graph(subscription_ids)
+        return
+    fetch = fetch_vm_data_sdk if mode == "sdk" else fetch_vm_data
+    yield from run_in_order(subscription_ids, fetch, CONFIG["max_workers"])
+
 
 def main():
-    subscription_id = CONFIG["subscription_id"]
+    mode = CONFIG["mode"]
     output_file = CONFIG["output_excel"]
 
-    print("🚀 Azure VM Full Inventory Script Started")
-    vm_data = fetch_vm_data(subscription_id)
+    print(f"🚀 Azure VM Full Inventory Script Started ({mode} mode)")
+    subscription_ids = resolve_subscriptions(mode)
 
-    if not vm_data:
+    sink = ExcelRowSink(output_file)
+    for subscription_id, vm_data in fetch_all(mode, subscription_ids):
+        if not vm_data:
+            print(f"⚠️ No VM data found or failed to retrieve data for {subscription_id}.")
+            continue
+        sink.write(extract_vm_info(vm_data, subscription_id))
+
+    total = sink.close()
+    if not total:
         print("⚠️ No VM data found or failed to retrieve data.")
         return
 
-    vm_info = extract_vm_info(vm_data, subscription_id)
-    save_to_excel(vm_info, output_file)
+    print(f"💾 Saving results to Excel: {output_file}")
+    print(f"✅ Export complete! {total} VM entries written.\n")
     print("🏁 Script finished.\n")
 
 if __name__ == "__main__":
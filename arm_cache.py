@@ -0,0 +1,223 @@
+import argparse
+import json
+import sqlite3
+import sys
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from azure.core.pipeline import PipelineResponse
+from azure.core.pipeline.policies import HTTPPolicy
+from azure.core.rest._requests_basic import RestRequestsTransportResponse
+
+# ---------------------
+# ⚙️ Defaults
+# ---------------------
+CACHE_FILE = ".arm_cache.sqlite"  # One row per (resource id, api-version); None disables the cache
+SCHEMA_VERSION = 2  # Bumped when what may be stored changes; older cache files start empty
+MAX_AGE_HOURS = 6  # Serve stored snapshots younger than this without calling ARM (0 = always revalidate)
+REVALIDATE = True  # Revalidate older snapshots with If-None-Match when ARM gave an ETag
+
+_AGE_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_PAGE_TOKENS = {"$skiptoken", "$skip"}
+
+# Per-call option that skips the cache: client.storage_accounts.list(**LIVE).
+# Only for clients from arm_clients.get_client(), whose pipeline consumes it.
+LIVE = {"arm_cache": False}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+# ---------------------
+# ⏳ Max Age (config, per run, or --max-age)
+# ---------------------
+def parse_max_age(value):
+    # "90" / "1.5" are hours; "30s", "15m", "6h", "2d" carry their own unit.
+    value = str(value).strip().lower()
+    unit = _AGE_UNITS.get(value[-1:])
+    try:
+        return float(value[:-1]) * unit if unit else float(value) * 3600
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid max age: {value!r} (use e.g. 0, 6, 30m, 12h, 1d)")
+
+
+def max_age_from_argv(argv=None):
+    # Scripts take no other arguments, so unknown ones are left alone.
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--max-age", type=parse_max_age)
+    args, _ = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+    return args.max_age
+
+
+# ---------------------
+# 🔑 Cache Keys
+# ---------------------
+def cache_key(url):
+    # (resource id, api-version). Any other query parameters ($expand,
+    # statusOnly, ...) stay part of the id so they never collide.
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    api_version = next((value for name, value in query if name.lower() == "api-version"), "")
+    rest = sorted((name, value) for name, value in query if name.lower() != "api-version")
+    resource_id = parts.path.rstrip("/").lower()
+    if rest:
+        resource_id += "?" + urlencode(rest)
+    return resource_id, api_version
+
+
+def is_page_request(url):
+    # Continuation pages of a listing ($skipToken / nextLink) are never cached.
+    return any(name.lower() in _PAGE_TOKENS for name, _ in parse_qsl(urlsplit(url).query, keep_blank_values=True))
+
+
+def is_single_resource(body):
+    # Only single-resource documents are stored. Collection listings
+    # ({"value": [...], "nextLink": ...}) must always be live, or resources
+    # created or deleted since would go unseen for up to max_age.
+    try:
+        document = json.loads(body)
+    except (TypeError, ValueError):
+        return False
+    return isinstance(document, dict) and "value" not in document and "nextLink" not in document
+
+
+# ---------------------
+# 🗄️ SQLite Snapshot Store
+# ---------------------
+class ArmCache:
+    # Raw JSON bodies of successful ARM GETs with their fetch time and ETag.
+    # One connection shared by every worker thread, guarded by a lock; WAL
+    # keeps readers from blocking while a write commits.
+    def __init__(self, path=CACHE_FILE, max_age=MAX_AGE_HOURS * 3600, revalidate=REVALIDATE):
+        self.path = path
+        self.max_age = max_age
+        self.revalidate = revalidate
+        self.hits = self.revalidated = self.stored = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # Earlier versions also stored listings; drop them rather than serve them.
+            self._db.execute("DROP TABLE IF EXISTS snapshots")
+            self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots ("
+            " resource_id TEXT NOT NULL, api_version TEXT NOT NULL,"
+            " body BLOB NOT NULL, content_type TEXT, etag TEXT, fetched_at REAL NOT NULL,"
+            " PRIMARY KEY (resource_id, api_version))"
+        )
+        self._db.commit()
+
+    def get(self, key):
+        with self._lock:
+            return self._db.execute(
+                "SELECT body, content_type, etag, fetched_at FROM snapshots WHERE resource_id = ? AND api_version = ?",
+                key,
+            ).fetchone()
+
+    def put(self, key, body, content_type, etag):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, body, content_type, etag, time.time()),
+            )
+            self._db.commit()
+            self.stored += 1
+
+    def touch(self, key):
+        # A 304 proves the snapshot is current; restart its age.
+        with self._lock:
+            self._db.execute(
+                "UPDATE snapshots SET fetched_at = ? WHERE resource_id = ? AND api_version = ?",
+                (time.time(), *key),
+            )
+            self._db.commit()
+            self.revalidated += 1
+
+    def count_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def summary(self):
+        return f"🗄️ ARM cache: {self.hits} served locally, {self.revalidated} revalidated (304), {self.stored} fetched"
+
+
+def get_cache():
+    # The process-wide cache, opened on first use; None when CACHE_FILE is None.
+    global _cache
+    with _cache_lock:
+        if _cache is None and CACHE_FILE:
+            max_age = max_age_from_argv()
+            _cache = ArmCache(CACHE_FILE, MAX_AGE_HOURS * 3600 if max_age is None else max_age)
+    return _cache
+
+
+def set_max_age(hours):
+    # Per-run override from a script's config; --max-age on the command line wins.
+    cache = get_cache()
+    if cache is not None and max_age_from_argv() is None:
+        cache.max_age = hours * 3600
+
+
+# ---------------------
+# 🚦 Pipeline Policy
+# ---------------------
+def snapshot_response(http_request, body, content_type):
+    # Rebuilds the stored body as a fully-read 200, the same response type the
+    # shared RequestsTransport hands to the SDK.
+    internal = requests.Response()
+    internal.status_code = 200
+    internal.reason = "OK"
+    internal.url = http_request.url
+    internal.headers["Content-Type"] = content_type or "application/json"
+    internal._content = body
+    response = RestRequestsTransportResponse(request=http_request, internal_response=internal, block_size=4096)
+    response._content = body
+    response._is_closed = True
+    return response
+
+
+class ArmCachePolicy(HTTPPolicy):
+    # Sits in front of the whole pipeline, so a fresh snapshot costs no token,
+    # no rate-limit slot and no round trip. Older snapshots are revalidated
+    # with If-None-Match; other single-resource GETs are fetched and stored.
+    # Listings and their pages always go to ARM, as does any call made with
+    # arm_cache=False (LIVE). With cache None the policy only consumes that option.
+    def __init__(self, cache):
+        super().__init__()
+        self.cache = cache
+
+    def send(self, request):
+        http_request = request.http_request
+        use_cache = request.context.options.pop("arm_cache", True)
+        if (not use_cache or self.cache is None or http_request.method != "GET"
+                or request.context.options.get("stream") or is_page_request(http_request.url)):
+            return self.next.send(request)
+
+        key = cache_key(http_request.url)
+        snapshot = self.cache.get(key)
+        if snapshot:
+            body, content_type, etag, fetched_at = snapshot
+            if time.time() - fetched_at < self.cache.max_age:
+                self.cache.count_hit()
+                return PipelineResponse(http_request, snapshot_response(http_request, body, content_type), request.context)
+            if etag and self.cache.revalidate:
+                http_request.headers["If-None-Match"] = etag
+
+        response = self.next.send(request)
+        http_response = response.http_response
+
+        if http_response.status_code == 304 and snapshot:
+            self.cache.touch(key)
+            return PipelineResponse(http_request, snapshot_response(http_request, body, content_type), request.context)
+        if http_response.status_code == 200 and is_single_resource(http_response.body()):
+            self.cache.put(key, http_response.body(), http_response.headers.get("Content-Type"), http_response.headers.get("ETag"))
+        return response
+
+
+def cache_policies():
+    # Keyword arguments that plug the cache into a sync management client. The
+    # policy goes in even when the cache is disabled, so LIVE is always accepted.
+    return {"per_call_policies": [ArmCachePolicy(get_cache())]}
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+
+import requests
+from azure.core.pipeline.transport import RequestsTransport
+from azure.identity import AzureCliCredential
+
+from arm_cache import cache_policies
+from arm_throttle import async_throttle_policies, throttle_policies
+
+# ---------------------
+# ⚙️ Defaults
+# ---------------------
+POOL_MAXSIZE = 64  # Keep-alive connections kept per host (ARM, Resource Graph, ...)
+TOKEN_REFRESH_MARGIN = 300  # Fetch a new token this many seconds before expiry
+
+_credential = None
+_transport = None
+_clients = {}
+_lock = threading.Lock()
+
+
+# ---------------------
+# 🔐 In-Process Token Cache
+# ---------------------
+class CachedTokenCredential:
+    # Hands out one token per scope until it nears expiry, so AzureCliCredential
+    # only shells out to `az account get-access-token` once per hour, not once
+    # per client.
+    def __init__(self, credential):
+        self._credential = credential
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def get_token(self, *scopes, **kwargs):
+        if kwargs.get("claims"):
+            return self._credential.get_token(*scopes, **kwargs)
+
+        key = (scopes, kwargs.get("tenant_id"))
+        with self._lock:
+            token = self._tokens.get(key)
+            if token is None or token.expires_on - TOKEN_REFRESH_MARGIN <= time.time():
+                token = self._credential.get_token(*scopes, **kwargs)
+                self._tokens[key] = token
+        return token
+
+    def close(self):
+        close = getattr(self._credential, "close", None)
+        if close:
+            close()
+
+
+class AsyncCachedTokenCredential:
+    # Async face of the same cache for the .aio clients; the `az` call (rare,
+    # thanks to the cache) runs on a worker thread instead of the event loop.
+    def __init__(self, credential):
+        self._credential = credential
+
+    async def get_token(self, *scopes, **kwargs):
+        return await asyncio.to_thread(self._credential.get_token, *scopes, **kwargs)
+
+    async def close(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+def get_credential():
+    global _credential
+    with _lock:
+        if _credential is None:
+            _credential = CachedTokenCredential(AzureCliCredential())
+    return _credential
+
+
+# ---------------------
+# 🔌 Pooled Management Clients
+# ---------------------
+def _shared_transport():
+    global _transport
+    if _transport is None:
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=POOL_MAXSIZE)
+        session.mount("https://", adapter)
+        _transport = RequestsTransport(session=session, session_owner=False)
+    return _transport
+
+
+def get_client(client_cls, subscription_id=None):
+    # One client per (service, subscription), all sharing the cached credential,
+    # a single keep-alive connection pool, the per-subscription rate limiter and
+    # the on-disk ARM snapshot cache. Safe to call from worker threads.
+    key = (client_cls.__name__, (subscription_id or "").lower())
+    credential = get_credential()
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            args = (credential,) if subscription_id is None else (credential, subscription_id)
+            client = client_cls(*args, transport=_shared_transport(), **throttle_policies(), **cache_policies())
+            _clients[key] = client
+    return client
+
+
+def get_async_client(client_cls, session, subscription_id=None):
+    # .aio counterpart of get_client(): clients ride on the caller's aiohttp
+    # session (one connection pool per sweep) and the async rate limiter.
+    from azure.core.pipeline.transport import AioHttpTransport
+
+    credential = AsyncCachedTokenCredential(get_credential())
+    args = (credential,) if subscription_id is None else (credential, subscription_id)
+    transport = AioHttpTransport(session=session, session_owner=False)
+    return client_cls(*args, transport=transport, **async_throttle_policies())
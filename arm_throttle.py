@@ -0,0 +1,245 @@
+import asyncio
+import random
+import re
+import threading
+import time
+
+from azure.core.pipeline.policies import AsyncHTTPPolicy, AsyncRetryPolicy, HTTPPolicy, RetryPolicy
+
+# ---------------------
+# ⚙️ Defaults
+# ---------------------
+READS_PER_SECOND = 20  # Steady ARM read rate per subscription (ARM refills 25/s per scope)
+BURST = 200  # Reads allowed back to back before the rate applies (ARM bucket holds 250)
+MIN_READS_PER_SECOND = 1  # Floor when the rate is backed off
+LOW_REMAINING = 100  # Back off when x-ms-ratelimit-remaining-* drops below this
+SLOW_DOWN_COOLDOWN = 5  # Seconds; the rate is halved at most once per this window
+RETRY_TOTAL = 6  # Attempts per request after the first one
+BACKOFF_FACTOR = 1.0  # Seconds; doubles per consecutive failure, with jitter
+BACKOFF_MAX = 60  # Upper bound for one backoff sleep
+RETRY_BUDGET_RATIO = 0.2  # Retries allowed as a share of all requests sent ...
+RETRY_BUDGET_MIN = 50  # ... plus this many, so a short run can still retry
+
+_SUBSCRIPTION_RE = re.compile(r"/subscriptions/([^/?]+)", re.IGNORECASE)
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+# ---------------------
+# 🪣 Per-Subscription Token Bucket
+# ---------------------
+class TokenBucket:
+    # Hands out one token per ARM request. The refill rate halves when ARM
+    # reports it is running low or throttles us, and creeps back up to the
+    # configured rate while responses stay healthy. Responses already in flight
+    # carry the same signal, so the rate halves at most once per cooldown.
+    def __init__(self, rate=READS_PER_SECOND, capacity=BURST, cooldown=SLOW_DOWN_COOLDOWN):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.cooldown = cooldown
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0
+        self._slowed_at = None
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _reserve(self):
+        # Takes a token and returns 0, or returns how long to wait before retrying.
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        while True:
+            wait = self._reserve()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        while True:
+            wait = self._reserve()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds):
+        # Retry-After applies to the whole subscription, not just the caller.
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0
+
+    def slow_down(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._slowed_at is not None and now - self._slowed_at < self.cooldown:
+                return
+            self._slowed_at = now
+            self.rate = max(MIN_READS_PER_SECOND, self.rate / 2)
+
+    def speed_up(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+def get_bucket(scope):
+    with _buckets_lock:
+        bucket = _buckets.get(scope)
+        if bucket is None:
+            bucket = _buckets[scope] = TokenBucket()
+    return bucket
+
+
+# ---------------------
+# 💰 Retry Budget
+# ---------------------
+class RetryBudget:
+    # Caps retries at RETRY_BUDGET_RATIO of the requests sent so far, so a
+    # throttled tenant slows down instead of multiplying its own load.
+    def __init__(self, ratio=RETRY_BUDGET_RATIO, minimum=RETRY_BUDGET_MIN):
+        self.ratio = ratio
+        self.minimum = minimum
+        self.requests = 0
+        self.retries = 0
+        self._warned = False
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def try_spend(self):
+        with self._lock:
+            if self.retries < self.minimum + self.requests * self.ratio:
+                self.retries += 1
+                return True
+            if not self._warned:
+                print(f"⚠️ Retry budget exhausted ({self.retries} retries for {self.requests} requests); failing fast")
+                self._warned = True
+            return False
+
+
+retry_budget = RetryBudget()
+
+
+# ---------------------
+# 📉 Header Parsing
+# ---------------------
+def subscription_scope(url):
+    match = _SUBSCRIPTION_RE.search(url)
+    return match.group(1).lower() if match else "tenant"
+
+
+def remaining_requests(headers):
+    # Smallest value across x-ms-ratelimit-remaining-* headers. Resource-provider
+    # headers look like "Microsoft.Compute/LowCostGet3Min;3996,...".
+    remaining = None
+    for name, value in headers.items():
+        if not name.lower().startswith("x-ms-ratelimit-remaining-"):
+            continue
+        for part in str(value).split(","):
+            try:
+                count = int(part.rsplit(";", 1)[-1])
+            except ValueError:
+                continue
+            remaining = count if remaining is None else min(remaining, count)
+    return remaining
+
+
+def retry_after_seconds(headers):
+    try:
+        return float(headers.get("Retry-After", BACKOFF_FACTOR))
+    except ValueError:
+        return BACKOFF_FACTOR  # HTTP-date form; RetryPolicy still honours it for the retry itself
+
+
+# ---------------------
+# 🚦 Pipeline Policies
+# ---------------------
+def observe_response(bucket, http_response):
+    remaining = remaining_requests(http_response.headers)
+    if http_response.status_code == 429:
+        bucket.pause(retry_after_seconds(http_response.headers))
+        bucket.slow_down()
+    elif remaining is not None and remaining < LOW_REMAINING:
+        bucket.slow_down()
+    else:
+        bucket.speed_up()
+
+
+class RateLimitPolicy(HTTPPolicy):
+    # Runs once per attempt (after the retry policy): waits for a token from the
+    # target subscription's bucket and adapts the bucket to ARM's feedback.
+    def send(self, request):
+        bucket = get_bucket(subscription_scope(request.http_request.url))
+        bucket.acquire()
+        retry_budget.record_request()
+
+        response = self.next.send(request)
+        observe_response(bucket, response.http_response)
+        return response
+
+
+class AsyncRateLimitPolicy(AsyncHTTPPolicy):
+    async def send(self, request):
+        bucket = get_bucket(subscription_scope(request.http_request.url))
+        await bucket.acquire_async()
+        retry_budget.record_request()
+
+        response = await self.next.send(request)
+        observe_response(bucket, response.http_response)
+        return response
+
+
+class AdaptiveRetryMixin:
+    # azure-core's retry policies already honour Retry-After; this adds jittered
+    # exponential backoff and stops retrying once the shared budget is spent.
+    # The budget is charged only once azure-core has decided to retry, so
+    # errors it would not retry anyway never drain it.
+    def __init__(self, **kwargs):
+        kwargs.setdefault("retry_total", RETRY_TOTAL)
+        kwargs.setdefault("retry_backoff_factor", BACKOFF_FACTOR)
+        kwargs.setdefault("retry_backoff_max", BACKOFF_MAX)
+        super().__init__(**kwargs)
+
+    def get_backoff_time(self, settings):
+        attempt = len(settings["history"])
+        if attempt < 1:
+            return 0
+        backoff = min(settings["max_backoff"], settings["backoff"] * (2 ** (attempt - 1)))
+        return backoff / 2 + random.uniform(0, backoff / 2)
+
+    def increment(self, settings, response=None, error=None):
+        if not super().increment(settings, response=response, error=error):
+            return False
+        return retry_budget.try_spend()
+
+
+class AdaptiveRetryPolicy(AdaptiveRetryMixin, RetryPolicy):
+    pass
+
+
+class AsyncAdaptiveRetryPolicy(AdaptiveRetryMixin, AsyncRetryPolicy):
+    pass
+
+
+def throttle_policies():
+    # Keyword arguments that plug both policies into a management client.
+    return {"retry_policy": AdaptiveRetryPolicy(), "per_retry_policies": [RateLimitPolicy()]}
+
+
+def async_throttle_policies():
+    # Same, for the .aio management clients.
+    return {"retry_policy": AsyncAdaptiveRetryPolicy(), "per_retry_policies": [AsyncRateLimitPolicy()]}
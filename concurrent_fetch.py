@@ -0,0 +1,38 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# ---------------------
+# ⚙️ Defaults
+# ---------------------
+MAX_WORKERS = 8  # Parallel ARM round trips in flight (1 = sequential)
+
+
+# ---------------------
+# 🚀 Bounded, Ordered Thread Pool
+# ---------------------
+def run_in_order(items, func, max_workers=MAX_WORKERS):
+    # Yields (item, func(item)) in the same order as `items`, while up to
+    # `max_workers` calls run in the background. Only 2 x max_workers calls are
+    # queued at any time, so 10k+ row inputs don't pile up futures in memory.
+    # An exception raised by func is re-raised here, at that item's position.
+    items = iter(items)
+
+    if max_workers <= 1:
+        for item in items:
+            yield item, func(item)
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = deque()
+    try:
+        for item in items:
+            pending.append((item, executor.submit(func, item)))
+            if len(pending) >= max_workers * 2:
+                head, future = pending.popleft()
+                yield head, future.result()
+
+        while pending:
+            head, future = pending.popleft()
+            yield head, future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
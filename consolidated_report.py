@@ -1,71 +1,61 @@
 import os
-import pandas as pd
 import time
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment, PatternFill
-from openpyxl.utils import get_column_letter
+from concurrent.futures import ThreadPoolExecutor
+from excel_reader import read_header
+from excel_writer import SKY_BLUE_HEADER, WRAP_TOP_LEFT, build_report, column_widths
+from frame_collector import FrameCollector
+from merge_cache import read_workbooks_cached
 
 # --- CONFIGURABLE FILTERS ---
 FILTER_SEVERITY_LIST = ["Informational", "Low"]
 FILTER_POLICY_ID_LIST = ["XYZ-00123", "ABC-99999"]
 
+MERGED_FILE = "merged_output.xlsx"
+FILTERED_FILE = "merged_filtered_output.xlsx"
+REPORT_WORKERS = 2  # Threads rendering both workbooks from the same in-memory frames (1 = one after the other)
+
 def list_excel_files():
-    excel_files = [f for f in os.listdir() if f.endswith(('.xlsx', '.xls')) and not f.startswith('~$')]
+    excel_files = [f for f in os.listdir() if f.endswith(('.xlsx', '.xls')) and not f.startswith('~$')
+                   and f not in (MERGED_FILE, FILTERED_FILE)]
     print(f"\n🔍 Found {len(excel_files)} Excel file(s):\n")
     for f in excel_files:
         print(f"  - {f}")
     return excel_files
 
 def read_columns(file):
+    # Header row only; the full read happens once, in merge_files
     try:
-        df = pd.read_excel(file)
-        return list(df.columns), df
+        return read_header(file)
     except Exception as e:
         print(f"❌ Error reading file {file}: {e}")
-        return [], None
+        return []
 
 def check_column_consistency(files):
-    reference_columns, _ = read_columns(files[0])
+    reference_columns = read_columns(files[0])
     mismatch_files = []
     for file in files[1:]:
-        current_columns, _ = read_columns(file)
+        current_columns = read_columns(file)
         if current_columns != reference_columns:
             mismatch_files.append(file)
     return len(mismatch_files) == 0, reference_columns, mismatch_files
 
 def merge_files(files, columns):
-    merged_df = pd.DataFrame(columns=columns)
-    for file in files:
-        df = pd.read_excel(file)
-        merged_df = pd.concat([merged_df, df], ignore_index=True)
+    # Only new or changed files are parsed (see merge_cache.py); frames are
+    # collected and concatenated once
+    collector = FrameCollector(columns)
+    for file, df in read_workbooks_cached(files):
+        collector.add(df)
         print(f"✅ Merged data from: {file} ({len(df)} rows)")
-    return merged_df
-
-def apply_excel_formatting(filename):
-    print(f"🎨 Applying formatting to: {filename}")
-    wb = load_workbook(filename)
-    ws = wb.active
-
-    ws.freeze_panes = "A2"
-    header_fill = PatternFill(start_color="87CEEB", end_color="87CEEB", fill_type="solid")
-
-    for cell in ws[1]:
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
-
-    for col in ws.columns:
-        max_length = 0
-        col_letter = get_column_letter(col[0].column)
-        for cell in col:
-            try:
-                max_length = max(max_length, len(str(cell.value)))
-                cell.alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
-            except:
-                pass
-        ws.column_dimensions[col_letter].width = max_length + 2
-
-    wb.save(filename)
+    return collector.result()
+
+def write_report(df, filename, summary_sheets):
+    # Main sheet with frozen sky-blue header, wrapped top-left cells and widths
+    # from the DataFrame, plus the summary sheets: one formatted write, no reloads
+    print(f"🎨 Writing report: {filename}")
+    build_report(df, filename, summary_sheets=summary_sheets, header_format={**SKY_BLUE_HEADER, **WRAP_TOP_LEFT},
+                 cell_format=WRAP_TOP_LEFT, widths=column_widths(df), freeze_header=True)
     print(f"✅ Formatting completed: {filename}")
+    return filename
 
 def format_time(seconds):
     if seconds < 60:
@@ -101,30 +91,31 @@ def filter_rows(df):
     print(f"📉 Rows before filter: {original_count}, after filter: {len(filtered_df)}")
     return filtered_df
 
-def add_summary_sheets(df, file_path, sheet_prefix=""):
+def summary_sheets(df, sheet_prefix=""):
+    sheets = []
     try:
-        with pd.ExcelWriter(file_path, engine='openpyxl', mode='a', if_sheet_exists='replace') as writer:
-            # --- Overall Summary ---
-            if "Severity" in df.columns:
-                overall = df['Severity'].value_counts().reset_index()
-                overall.columns = ['Severity', 'Count']
-                overall.loc[len(overall.index)] = ['Total Findings', len(df)]
-                overall.to_excel(writer, sheet_name=f"{sheet_prefix}Summary_Overall", index=False)
-
-            # --- BU-wise Summary ---
-            if 'BU' in df.columns and 'Severity' in df.columns:
-                bu_summary = (
-                    df.groupby(['BU', 'Severity'])
-                    .size()
-                    .unstack(fill_value=0)
-                    .reset_index()
-                )
-                bu_summary["Total"] = bu_summary.iloc[:, 1:].sum(axis=1)
-                bu_summary.to_excel(writer, sheet_name=f"{sheet_prefix}Summary_By_BU", index=False)
-            else:
-                print("⚠️ Columns 'BU' or 'Severity' not found. Skipping BU-wise summary.")
+        # --- Overall Summary ---
+        if "Severity" in df.columns:
+            overall = df['Severity'].value_counts().reset_index()
+            overall.columns = ['Severity', 'Count']
+            overall.loc[len(overall.index)] = ['Total Findings', len(df)]
+            sheets.append((f"{sheet_prefix}Summary_Overall", overall))
+
+        # --- BU-wise Summary ---
+        if 'BU' in df.columns and 'Severity' in df.columns:
+            bu_summary = (
+                df.groupby(['BU', 'Severity'])
+                .size()
+                .unstack(fill_value=0)
+                .reset_index()
+            )
+            bu_summary["Total"] = bu_summary.iloc[:, 1:].sum(axis=1)
+            sheets.append((f"{sheet_prefix}Summary_By_BU", bu_summary))
+        else:
+            print("⚠️ Columns 'BU' or 'Severity' not found. Skipping BU-wise summary.")
     except Exception as e:
-        print(f"❌ Failed to write summary sheets to {file_path}: {e}")
+        print(f"❌ Failed to build {sheet_prefix}summary sheets: {e}")
+    return sheets
 
 def main():
     start_time = time.time()
@@ -148,22 +139,25 @@ def main():
     print("\n📦 Merging files...\n")
     merged_df = merge_files(files, reference_columns)
 
-    # Save merged
-    merged_file = "merged_output.xlsx"
-    merged_df.to_excel(merged_file, index=False)
-    apply_excel_formatting(merged_file)
-    add_summary_sheets(merged_df, merged_file, sheet_prefix="Merged_")
-    print(f"\n📁 Merged file saved as: {merged_file}")
-
-    # Filtered file
+    # Filtered frame, from the merged one already in memory
     print("\n🧹 Filtering based on Severity and Policy ID...\n")
     filtered_df = filter_rows(merged_df)
 
-    filtered_file = "merged_filtered_output.xlsx"
-    filtered_df.to_excel(filtered_file, index=False)
-    apply_excel_formatting(filtered_file)
-    add_summary_sheets(filtered_df, filtered_file, sheet_prefix="Filtered_")
-    print(f"\n📁 Filtered file saved as: {filtered_file}")
+    # Both workbooks rendered concurrently, each written once with its summary
+    # sheets. Threads read the frames in place (no copy into another process);
+    # they overlap where xlsxwriter is in file I/O and zip compression.
+    reports = [
+        (merged_df, MERGED_FILE, summary_sheets(merged_df, sheet_prefix="Merged_")),
+        (filtered_df, FILTERED_FILE, summary_sheets(filtered_df, sheet_prefix="Filtered_")),
+    ]
+    if REPORT_WORKERS > 1:
+        with ThreadPoolExecutor(max_workers=REPORT_WORKERS) as executor:
+            written = list(executor.map(write_report, *zip(*reports)))
+    else:
+        written = [write_report(*report) for report in reports]
+
+    print(f"\n📁 Merged file saved as: {written[0]}")
+    print(f"📁 Filtered file saved as: {written[1]}")
 
     # Completion
     end_time = time.time()
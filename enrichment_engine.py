@@ -0,0 +1,221 @@
+import json
+import sys
+import time
+from collections import defaultdict
+
+import pandas as pd
+
+from excel_writer import HEADER, TOP_LEFT, SheetStreamWriter, write_frame
+from reference_cache import normalize_keys, read_reference
+
+# ---------------------
+# ⚙️ Defaults
+# ---------------------
+CONFIG_FILE = "v1_config.json"  # Used when no config path is given on the command line
+SHEET_NAME = "Issues"
+ACCOUNT_COLUMN = "Account"
+RESOURCE_COLUMN = "Resource ID"
+CHUNK_SIZE = None  # Input rows per chunk when streaming the CSV (None = read it whole; config "chunk_size" wins)
+
+
+# ---------------------
+# 📥 Config
+# ---------------------
+def normalize_mapping(mapping, config):
+    # Both config dialects become {name, file, sheet, key, columns, not_found_message, unmatched_log}:
+    #   v1_config.json: sheet / key / columns, with the workbook in config["anex_file"]
+    #   x1_config.json: file / sheet / join_column / source_to_target
+    return {
+        "name": mapping.get("name") or mapping["sheet"],
+        "file": mapping.get("file") or config["anex_file"],
+        "sheet": mapping["sheet"],
+        "key": mapping.get("key") or mapping["join_column"],
+        "columns": mapping.get("columns") or mapping["source_to_target"],
+        "not_found_message": mapping.get("not_found_message"),
+        "unmatched_log": mapping.get("unmatched_log"),
+    }
+
+
+def load_config(path):
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    config["mappings"] = [normalize_mapping(mapping, config) for mapping in config.get("mappings", [])]
+    return config
+
+
+# ---------------------
+# 📚 Annex Workbooks (one open each)
+# ---------------------
+def read_annexes(mappings):
+    # Returns {(file, sheet): DataFrame}. Every sheet any mapping needs from a
+    # workbook is parsed in a single read_excel call on that workbook, or served
+    # from the reference cache while the workbook is unchanged.
+    sheets_by_file = defaultdict(list)
+    keys_by_file = defaultdict(set)
+    for mapping in mappings:
+        if mapping["sheet"] not in sheets_by_file[mapping["file"]]:
+            sheets_by_file[mapping["file"]].append(mapping["sheet"])
+        keys_by_file[mapping["file"]].add(mapping["key"])
+
+    annexes = {}
+    for file, sheets in sheets_by_file.items():
+        print(f"📄 Reading {len(sheets)} sheet(s) from {file}: {sheets}")
+        for sheet, frame in read_reference(file, sheets, keys_by_file[file]).items():
+            annexes[(file, sheet)] = frame
+    return annexes
+
+
+# ---------------------
+# 🧹 Input Preparation
+# ---------------------
+def prepare_input(df, config, report=True):
+    account_column = config.get("account_column_name", ACCOUNT_COLUMN)
+    resource_column = config.get("resource_column_name", RESOURCE_COLUMN)
+
+    if config.get("parse_account_column", True) and account_column in df.columns:
+        # As strings: a chunk whose accounts are all blank is read as float
+        accounts = df[account_column].astype(str)
+        df["Subscription ID"] = accounts.str.extract(r"^(\S+)\s*\(")[0].str.replace(r"\s+", "", regex=True)
+        df["Subscription Name"] = accounts.str.extract(r"\((.*?)\)")[0].str.replace(r"\s+", "", regex=True)
+
+    if resource_column in df.columns:
+        df[resource_column] = df[resource_column].astype(str).str.split("/").str[-1]
+
+    existing_to_drop = [col for col in config.get("columns_to_remove", []) if col in df.columns]
+    df = df.drop(columns=existing_to_drop)
+    if report:
+        print(f"🧹 Dropped columns: {existing_to_drop if existing_to_drop else 'None'}")
+
+    for col in config.get("columns_to_add", []):
+        df[col] = ""
+    return df
+
+
+# ---------------------
+# 🔗 Join Plan
+# ---------------------
+def build_lookup(annex, mapping):
+    # The annex reduced to a unique key index over the mapped source columns.
+    # The first row wins for a repeated key, so no input row is ever duplicated.
+    sources = list(mapping["columns"])
+    missing = [col for col in sources if col not in annex.columns]
+    if missing:
+        print(f"⚠️ {mapping['name']}: columns {missing} not in sheet '{mapping['sheet']}', left unmatched")
+
+    lookup = annex.reindex(columns=sources)
+    lookup.index = pd.Index(normalize_keys(annex[mapping["key"]]))
+    return lookup[lookup.index.notna() & ~lookup.index.duplicated()]
+
+
+def build_lookups(mappings, annexes):
+    # Built once per run; streaming reuses them for every chunk.
+    return {mapping["name"]: build_lookup(annexes[(mapping["file"], mapping["sheet"])], mapping) for mapping in mappings}
+
+
+def usable_mappings(mappings, columns):
+    usable = []
+    for mapping in mappings:
+        if mapping["key"] not in columns:
+            print(f"❌ {mapping['name']}: key column '{mapping['key']}' not in input, skipped")
+        else:
+            usable.append(mapping)
+    return usable
+
+
+def apply_mappings(df, mappings, lookups):
+    # Each mapping is one hash lookup: the input key column is reindexed against
+    # the annex's unique key index, and every target column is filled from it.
+    # Mappings run in config order, so a key produced by an earlier mapping can
+    # drive a later one. Returns the unmatched keys per mapping, in order seen.
+    unmatched = {}
+    for mapping in mappings:
+        lookup = lookups[mapping["name"]]
+        keys = normalize_keys(df[mapping["key"]])
+        joined = lookup.reindex(keys.to_numpy())
+
+        for source, target in mapping["columns"].items():
+            values = joined[source]
+            if mapping["not_found_message"] is not None:
+                values = values.fillna(mapping["not_found_message"])
+            df[target] = values.to_numpy()
+
+        unmatched[mapping["name"]] = keys[keys.notna() & ~keys.isin(lookup.index)].unique()
+    return df, unmatched
+
+
+def write_unmatched_logs(mappings, unmatched):
+    for mapping in mappings:
+        values = unmatched.get(mapping["name"])
+        if values is None:
+            continue
+        print(f"{'⚠️' if len(values) else '✅'} {mapping['name']}: {len(values)} unmatched '{mapping['key']}' value(s)")
+        if mapping["unmatched_log"] and len(values):
+            with open(mapping["unmatched_log"], "w", encoding="utf-8") as f:
+                f.writelines(f"{value}\n" for value in values)
+            print(f"📁 Unmatched {mapping['key']} values saved to '{mapping['unmatched_log']}'")
+
+
+# ---------------------
+# 💾 Output
+# ---------------------
+def write_output(df, path, sheet_name=SHEET_NAME):
+    # Top-left aligned cells via a column format, applied during the one write.
+    write_frame(df, path, sheet_name, header_format={**HEADER, **TOP_LEFT}, cell_format=TOP_LEFT)
+
+
+# ---------------------
+# 🌊 Streaming
+# ---------------------
+def stream_enrichment(config, mappings, lookups, chunk_size):
+    # Reads the CSV chunk_size rows at a time and enriches each chunk against
+    # the prebuilt lookups, writing it straight to a constant-memory workbook
+    # (split into further sheets at Excel's row limit). Only the chunk in hand
+    # and the unmatched keys seen so far are held in memory.
+    unmatched = defaultdict(dict)
+    with SheetStreamWriter(config["output_excel"], SHEET_NAME, header_format={**HEADER, **TOP_LEFT},
+                           cell_format=TOP_LEFT) as writer:
+        for number, chunk in enumerate(pd.read_csv(config["input_csv"], chunksize=chunk_size), 1):
+            chunk = prepare_input(chunk, config, report=number == 1)
+            if number == 1:
+                mappings = usable_mappings(mappings, chunk.columns)
+            chunk, chunk_unmatched = apply_mappings(chunk, mappings, lookups)
+            for name, values in chunk_unmatched.items():
+                unmatched[name].update(dict.fromkeys(values))
+            writer.write(chunk)
+            print(f"🌊 Chunk {number}: {writer.rows_written} rows written")
+
+    if len(writer.sheets) > 1:
+        print(f"📑 Output split over {len(writer.sheets)} sheets: {writer.sheets}")
+    return mappings, {name: list(values) for name, values in unmatched.items()}
+
+
+# ---------------------
+# 🚀 Run
+# ---------------------
+def run_enrichment(config_path=CONFIG_FILE, chunk_size=CHUNK_SIZE):
+    # Returns the enriched DataFrame, or None when the input was streamed.
+    start_time = time.time()
+    config = load_config(config_path)
+    mappings = config["mappings"]
+    chunk_size = config.get("chunk_size", chunk_size)
+    print(f"\n🚀 Enriching {config['input_csv']} with {len(mappings)} mapping(s) from {config_path}")
+
+    lookups = build_lookups(mappings, read_annexes(mappings))
+    df = None
+    if chunk_size:
+        print(f"🌊 Streaming input in chunks of {chunk_size} rows")
+        mappings, unmatched = stream_enrichment(config, mappings, lookups, chunk_size)
+    else:
+        df = prepare_input(pd.read_csv(config["input_csv"]), config)
+        mappings = usable_mappings(mappings, df.columns)
+        df, unmatched = apply_mappings(df, mappings, lookups)
+        write_output(df, config["output_excel"])
+    write_unmatched_logs(mappings, unmatched)
+
+    print(f"💾 Excel saved to: {config['output_excel']}")
+    print(f"✅ Completed in {time.time() - start_time:.2f} seconds.")
+    return df
+
+
+if __name__ == "__main__":
+    run_enrichment(sys.argv[1] if len(sys.argv) > 1 else CONFIG_FILE)
@@ -0,0 +1,93 @@
+import os
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pandas as pd
+from openpyxl import load_workbook
+
+# ---------------------
+# ⚙️ Defaults
+# ---------------------
+READ_WORKERS = os.cpu_count() or 1  # Worker processes parsing workbooks (1 = parse in this process)
+
+
+# ---------------------
+# 🔎 Header Probe
+# ---------------------
+def read_header(path):
+    # Column names of the first sheet, read from row 1 only. A read-only
+    # openpyxl workbook streams the sheet XML, so nothing past the header is
+    # parsed. Blank header cells get pandas' "Unnamed: <n>" names and repeated
+    # ones its ".1", ".2" suffixes; trailing blank ones are dropped, since their
+    # columns cannot be told apart from formatted-but-empty cells without
+    # reading the rows.
+    if not path.lower().endswith((".xlsx", ".xlsm")):
+        return list(pd.read_excel(path, nrows=0).columns)
+
+    wb = load_workbook(path, read_only=True)
+    try:
+        header = list(next(wb.worksheets[0].iter_rows(max_row=1, values_only=True), ()))
+    finally:
+        wb.close()
+
+    while header and header[-1] is None:
+        header.pop()
+    names = [f"Unnamed: {i}" if value is None else value for i, value in enumerate(header)]
+    return dedup_names(names, unnamed=[i for i, value in enumerate(header) if value is None])
+
+
+def dedup_names(names, unnamed=()):
+    # pandas' renaming of repeated headers (its python parser, which read_excel
+    # uses): A, A, A → A, A.1, A.2, skipping suffixed names already present.
+    # Named columns are renamed before the unnamed ones, as pandas does.
+    names, unnamed = list(names), list(unnamed)
+    skip = set(unnamed)
+    counts = defaultdict(int)
+    for i in [i for i in range(len(names)) if i not in skip] + unnamed:
+        name = original = names[i]
+        count = counts[name]
+        while count > 0:
+            counts[original] = count + 1
+            name = f"{original}.{count}"
+            count = count + 1 if name in names else counts[name]
+        names[i] = name
+        counts[name] = count + 1
+    return names
+
+
+def check_headers(paths):
+    # (all_match, reference_columns, mismatched_paths) against the first file.
+    reference = read_header(paths[0])
+    mismatches = [path for path in paths[1:] if read_header(path) != reference]
+    return not mismatches, reference, mismatches
+
+
+# ---------------------
+# 📚 Parallel Full Read
+# ---------------------
+def read_workbooks(paths, max_workers=READ_WORKERS, **read_options):
+    # Yields (path, DataFrame) in the order given, each workbook parsed exactly
+    # once. Parsing is CPU-bound, so the files are spread over worker processes;
+    # callers must run under an `if __name__ == "__main__":` guard for that.
+    # At most 2 x max_workers files are in flight, so parsed frames do not pile
+    # up ahead of a caller that consumes them one at a time.
+    paths = list(paths)
+    read = partial(pd.read_excel, **read_options)
+
+    if max_workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield path, read(path)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(paths))) as executor:
+        pending = deque()
+        for path in paths:
+            pending.append((path, executor.submit(read, path)))
+            if len(pending) >= max_workers * 2:
+                head, future = pending.popleft()
+                yield head, future.result()
+
+        while pending:
+            head, future = pending.popleft()
+            yield head, future.result()
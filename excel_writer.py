@@ -0,0 +1,171 @@
+import pandas as pd
+import xlsxwriter
+
+# ---------------------
+# ⚙️ Defaults
+# ---------------------
+EXCEL_MAX_ROWS = 1_048_576  # Rows per worksheet, header row included
+WIDTH_SAMPLE_ROWS = 50_000  # Longer columns are measured on a random sample of this many values
+
+# ---------------------
+# 🎨 Formats (xlsxwriter properties)
+# ---------------------
+TOP_LEFT = {"align": "left", "valign": "top"}
+WRAP_TOP_LEFT = {**TOP_LEFT, "text_wrap": True}
+HEADER = {"bold": True, "border": 1, "align": "center", "valign": "top"}  # The look pandas gives a header row
+SKY_BLUE_HEADER = {**HEADER, "bg_color": "#87CEEB"}
+
+
+# ---------------------
+# 📏 Column Widths
+# ---------------------
+def column_widths(df, padding=2, max_width=None, quantile=None, sample_rows=WIDTH_SAMPLE_ROWS):
+    # Auto-fit widths worked out from the DataFrame before it is written: the
+    # header or the longest non-empty value (or the given length quantile, to
+    # ignore a few outliers), plus padding. Each column is one vectorised
+    # str.len(); columns with more than sample_rows values are measured on a
+    # fixed random sample of them, so a 500k-row report costs the same as 50k.
+    widths = {}
+    for column in df.columns:
+        values = df[column].dropna()
+        if sample_rows and len(values) > sample_rows:
+            values = values.sample(sample_rows, random_state=0)
+
+        lengths = values.astype(str).str.len()
+        longest = 0
+        if len(lengths):
+            longest = int(lengths.quantile(quantile) if quantile is not None else lengths.max())
+
+        width = max(len(str(column)), longest) + padding
+        widths[column] = min(width, max_width) if max_width else width
+    return widths
+
+
+# ---------------------
+# 🖨️ Format-at-Write
+# ---------------------
+def write_sheet(writer, df, sheet_name="Sheet1", header_format=None, cell_format=None, widths=None,
+                freeze_header=False, autofilter=False):
+    # Writes df to a sheet of an xlsxwriter-backed pd.ExcelWriter with all the
+    # formatting applied as it is written: the header row gets header_format,
+    # every column gets cell_format and its width as one column-level setting.
+    # Nothing is re-opened afterwards; only date columns are written with a
+    # cell format of their own (see write_dates).
+    df.to_excel(writer, sheet_name=sheet_name, index=False, header=False, startrow=1)
+    book, sheet = writer.book, writer.sheets[sheet_name]
+
+    header = book.add_format(header_format) if header_format else None
+    cells = book.add_format(cell_format) if cell_format else None
+    for i, column in enumerate(df.columns):
+        sheet.write(0, i, str(column), header)
+        width = widths.get(column) if widths else None
+        if width is not None or cells is not None:
+            sheet.set_column(i, i, width, cells)
+        if cell_format:
+            write_dates(writer, sheet, i, df[column], cell_format)
+
+    if freeze_header:
+        sheet.freeze_panes(1, 0)
+    if autofilter and len(df.columns):
+        sheet.autofilter(0, 0, len(df), len(df.columns) - 1)
+    return sheet
+
+
+def write_dates(writer, sheet, col, values, cell_format):
+    # pandas gives date and datetime cells a number format of their own, which
+    # hides the column format, so such a column is written again with both in
+    # one format. Other columns are left to the column-level format.
+    kind = pd.api.types.infer_dtype(values, skipna=True)
+    if kind in ("datetime64", "datetime"):
+        num_format = writer.datetime_format
+    elif kind == "date":
+        num_format = writer.date_format
+    else:
+        return
+    dates = writer.book.add_format({**cell_format, "num_format": num_format})
+    sheet.write_column(1, col, values.astype(object).where(values.notna(), None), dates)
+
+
+def write_frame(df, path, sheet_name="Sheet1", **sheet_options):
+    # One DataFrame, one formatted sheet, one write.
+    with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+        write_sheet(writer, df, sheet_name, **sheet_options)
+
+
+def build_report(df, path, sheet_name="Sheet1", summary_sheets=(), **sheet_options):
+    # A complete multi-sheet workbook in one pass: df as the formatted main
+    # sheet, followed by each (sheet_name, DataFrame) in summary_sheets as a
+    # plain table. The file is written once and never reopened.
+    with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+        write_sheet(writer, df, sheet_name, **sheet_options)
+        for summary_name, summary in summary_sheets:
+            summary.to_excel(writer, sheet_name=summary_name, index=False)
+    return path
+
+
+# ---------------------
+# 🌊 Streaming Sheet Writer
+# ---------------------
+class SheetStreamWriter:
+    # Appends DataFrame chunks to a constant-memory xlsxwriter workbook: each row
+    # is flushed to disk once the next one starts, so memory stays flat however
+    # many rows go through. A sheet that reaches Excel's row limit continues on
+    # "<sheet>_2", "<sheet>_3", ... with the header repeated.
+    def __init__(self, path, sheet_name="Sheet1", header_format=None, cell_format=None, widths=None,
+                 freeze_header=False, max_rows=EXCEL_MAX_ROWS):
+        self.path = path
+        self.sheet_name = sheet_name
+        self.widths = widths or {}
+        self.freeze_header = freeze_header
+        self.max_rows = max_rows
+
+        self.book = xlsxwriter.Workbook(path, {"constant_memory": True})
+        self.header_format = self.book.add_format(header_format) if header_format else None
+        self.cell_format = self.book.add_format(cell_format) if cell_format else None
+
+        self.columns = None
+        self.sheets = []
+        self.sheet = None
+        self.row = 0
+        self.rows_written = 0
+
+    def _new_sheet(self):
+        name = self.sheet_name if not self.sheets else f"{self.sheet_name}_{len(self.sheets) + 1}"
+        self.sheet = self.book.add_worksheet(name)
+        self.sheets.append(name)
+
+        for i, column in enumerate(self.columns):
+            self.sheet.set_column(i, i, self.widths.get(column), self.cell_format)
+        if self.freeze_header:
+            self.sheet.freeze_panes(1, 0)
+
+        self.sheet.write_row(0, 0, self.columns, self.header_format)
+        self.row = 1
+
+    def write(self, chunk):
+        # Columns are fixed by the first chunk; later chunks are aligned to them.
+        if self.columns is None:
+            self.columns = [str(column) for column in chunk.columns]
+            self._new_sheet()
+        else:
+            chunk = chunk.reindex(columns=self.columns)
+
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for record in values.itertuples(index=False, name=None):
+            if self.row >= self.max_rows:
+                self._new_sheet()
+            self.sheet.write_row(self.row, 0, record)
+            self.row += 1
+        self.rows_written += len(chunk)
+
+    def close(self):
+        if self.sheet is None:
+            self.columns = self.columns or []
+            self._new_sheet()
+        self.book.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,30 @@
+import pandas as pd
+
+
+# ---------------------
+# 📥 Linear-Time Collector
+# ---------------------
+class FrameCollector:
+    # Collects per-file frames and concatenates them once, in result(), so
+    # merging n files copies every row once instead of re-copying everything
+    # merged so far on each file. The merged frame is built in memory: the
+    # callers filter, summarise and size columns over all of it.
+    def __init__(self, columns=None):
+        self.columns = list(columns) if columns is not None else None
+        self.frames = []
+        self.rows = 0
+
+    def add(self, df):
+        self.frames.append(df)
+        self.rows += len(df)
+
+    def result(self):
+        # Every collected row in add() order, with `columns` first when given.
+        if not self.frames:
+            return pd.DataFrame(columns=self.columns)
+        merged = pd.concat(self.frames, ignore_index=True)
+        self.frames = []
+
+        if self.columns is not None:
+            merged = merged.reindex(columns=self.columns + [c for c in merged.columns if c not in self.columns])
+        return merged
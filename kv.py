@@ -1,14 +1,20 @@
 import pandas as pd
-import os
 import json
 import time
 from pandas.io.excel import ExcelWriter
+from azure.mgmt.keyvault import KeyVaultManagementClient
+from arm_clients import get_client
+from concurrent_fetch import run_in_order
+from resource_graph import rest_dict
+from resource_index import get_vault_from_cache
 
 # ====== CONFIGURATION ======
 input_file = "keyvault_input.xlsx"
 output_file = "keyvault_filtered_network_access_report.xlsx"
 sheet_name = "Sheet1"
 policy_id_filter = ["KV-PublicAccess", "KV-OpenToAll"]  # Modify as needed
+collection_mode = "sdk"  # "sdk" = in-process ARM reads per vault, "graph" = one Resource Graph sweep
+max_workers = 8  # Vaults fetched in parallel in sdk mode
 # ===========================
 
 start = time.time()
@@ -26,6 +32,44 @@ filtered_df = df[df["Policy ID"].isin(normalized_policy_filter)]
 total = len(filtered_df)
 print(f"🔍 Found {total} matching rows for Policy ID(s): {policy_id_filter}")
 
+# Fetch each distinct vault once, grouped by subscription, before the report loop
+vault_keys = sorted(
+    {(str(sub).strip(), str(name).strip()) for sub, name in zip(filtered_df["Subscription ID"], filtered_df["Key Vault Name"])},
+    key=lambda key: (key[0].lower(), key[1].lower()),
+)
+
+if collection_mode == "graph":
+    from resource_graph import fetch_keyvaults, lookup_graph_resource
+
+    graph_vaults = fetch_keyvaults(sorted({sub for sub, _ in vault_keys}), raw=True)
+
+    def fetch_vault(key):
+        vault_ref = lookup_graph_resource(graph_vaults, *key)
+        if not vault_ref:
+            raise LookupError("Key Vault not found in Resource Graph results")
+        return vault_ref[2]
+else:
+    def fetch_vault(key):
+        # The subscription's vault listing is shared through the resource index,
+        # then one GET returns the same JSON `az keyvault show` prints.
+        subscription_id, kv_name = key
+        client = get_client(KeyVaultManagementClient, subscription_id)
+        vault_ref = get_vault_from_cache(client, subscription_id, kv_name)
+        if not vault_ref:
+            raise LookupError("Key Vault not found")
+        return rest_dict(client.vaults.get(vault_ref[0], kv_name))
+
+
+def fetch_or_error(key):
+    try:
+        return fetch_vault(key)
+    except Exception as e:
+        return e
+
+
+print(f"🚀 Fetching {len(vault_keys)} Key Vault(s) ({collection_mode} mode, {max_workers} worker(s))")
+vault_data = dict(run_in_order(vault_keys, fetch_or_error, max_workers))
+
 # Initialize result tracking
 results = []
 success_count = 0
@@ -40,15 +84,9 @@ for row_num, (_, row) in enumerate(filtered_df.iterrows(), start=1):
     print(f"\n🔄 [{row_num}/{total}] Checking Key Vault: {kv_name} (Policy: {policy_id})")
 
     try:
-        # Set subscription
-        os.system(f'az account set --subscription "{subscription_id}"')
-
-        # Run Azure CLI and get JSON output
-        az_cmd = f'az keyvault show --name "{kv_name}" --subscription "{subscription_id}" --output json'
-        with os.popen(az_cmd) as stream:
-            raw_output = stream.read()
-
-        kv_data = json.loads(raw_output)
+        kv_data = vault_data[(subscription_id, kv_name)]
+        if isinstance(kv_data, Exception):
+            raise kv_data
 
         # Extract fields
         network_acls = json.dumps(kv_data.get("properties", {}).get("networkAcls", {}), indent=2)
@@ -1,63 +1,45 @@
 import os
 import pandas as pd
 import time
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment, PatternFill
-from openpyxl.utils import get_column_letter
+from excel_reader import check_headers
+from excel_writer import SKY_BLUE_HEADER, WRAP_TOP_LEFT, column_widths, write_sheet
+from frame_collector import FrameCollector
+from merge_cache import read_workbooks_cached
 
 OUTPUT_FILE = "merged_output.xlsx"
 
 def list_excel_files():
-    return [f for f in os.listdir() if f.endswith(('.xlsx', '.xls')) and not f.startswith('~$')]
+    return [f for f in os.listdir() if f.endswith(('.xlsx', '.xls')) and not f.startswith('~$') and f != OUTPUT_FILE]
 
 def check_column_consistency(files):
-    ref_cols, _ = pd.read_excel(files[0], nrows=1), None
-    mismatches = []
-    for file in files[1:]:
-        cols = pd.read_excel(file, nrows=1).columns
-        if list(cols) != list(ref_cols.columns):
-            mismatches.append(file)
-    return len(mismatches) == 0, ref_cols.columns.tolist(), mismatches
+    # Header row only; the full read happens once, in merge_files
+    return check_headers(files)
 
 def merge_files(files, columns):
-    df_all = pd.DataFrame(columns=columns)
-    for f in files:
-        df = pd.read_excel(f)
-        df_all = pd.concat([df_all, df], ignore_index=True)
+    # Only new or changed files are parsed (see merge_cache.py); frames are
+    # collected and concatenated once
+    collector = FrameCollector(columns)
+    for f, df in read_workbooks_cached(files):
+        collector.add(df)
         print(f"✅ Merged: {f} ({len(df)} rows)")
-    return df_all
+    return collector.result()
 
-def format_excel(filename):
-    wb = load_workbook(filename)
-    ws = wb.active
-    ws.freeze_panes = "A2"
-    header_fill = PatternFill(start_color="87CEEB", end_color="87CEEB", fill_type="solid")
+def format_excel(df, writer):
+    # Frozen sky-blue header, wrapped top-left cells and auto-fit widths, applied while writing
+    write_sheet(writer, df, "Sheet1", header_format={**SKY_BLUE_HEADER, **WRAP_TOP_LEFT}, cell_format=WRAP_TOP_LEFT,
+                widths=column_widths(df), freeze_header=True)
 
-    for cell in ws[1]:
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
+def add_summary(df, writer, prefix="Merged_"):
+    if "Severity" in df.columns:
+        summary = df["Severity"].value_counts().reset_index()
+        summary.columns = ["Severity", "Count"]
+        summary.loc[len(summary)] = ["Total Findings", len(df)]
+        summary.to_excel(writer, sheet_name=f"{prefix}Summary_Overall", index=False)
 
-    for col in ws.columns:
-        col_letter = get_column_letter(col[0].column)
-        max_width = max((len(str(cell.value)) for cell in col if cell.value), default=10)
-        for cell in col:
-            cell.alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
-        ws.column_dimensions[col_letter].width = max_width + 2
-
-    wb.save(filename)
-
-def add_summary(df, path, prefix="Merged_"):
-    with pd.ExcelWriter(path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-        if "Severity" in df.columns:
-            summary = df["Severity"].value_counts().reset_index()
-            summary.columns = ["Severity", "Count"]
-            summary.loc[len(summary)] = ["Total Findings", len(df)]
-            summary.to_excel(writer, sheet_name=f"{prefix}Summary_Overall", index=False)
-
-        if "BU" in df.columns and "Severity" in df.columns:
-            bu_summary = df.groupby(["BU", "Severity"]).size().unstack(fill_value=0).reset_index()
-            bu_summary["Total"] = bu_summary.iloc[:, 1:].sum(axis=1)
-            bu_summary.to_excel(writer, sheet_name=f"{prefix}Summary_By_BU", index=False)
+    if "BU" in df.columns and "Severity" in df.columns:
+        bu_summary = df.groupby(["BU", "Severity"]).size().unstack(fill_value=0).reset_index()
+        bu_summary["Total"] = bu_summary.iloc[:, 1:].sum(axis=1)
+        bu_summary.to_excel(writer, sheet_name=f"{prefix}Summary_By_BU", index=False)
 
 def main():
     start = time.time()
@@ -72,9 +54,9 @@ def main():
         return
 
     df = merge_files(files, columns)
-    df.to_excel(OUTPUT_FILE, index=False)
-    format_excel(OUTPUT_FILE)
-    add_summary(df, OUTPUT_FILE)
+    with pd.ExcelWriter(OUTPUT_FILE, engine="xlsxwriter") as writer:
+        format_excel(df, writer)
+        add_summary(df, writer)
     print(f"\n✅ Output written to: {OUTPUT_FILE}")
     print(f"⏱️ Done in {time.time() - start:.2f} seconds.")
 
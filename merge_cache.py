@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from excel_reader import READ_WORKERS, read_workbooks
+
+# ---------------------
+# ⚙️ Defaults
+# ---------------------
+MERGE_CACHE_DIR = ".merge_cache"  # Manifest + one parsed shard per source workbook; None disables
+MANIFEST_FILE = "manifest.json"
+
+
+# ---------------------
+# 🔑 File Identity
+# ---------------------
+def _digest(*parts):
+    return hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:16]
+
+
+def content_hash(path):
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+# ---------------------
+# 📒 Manifest
+# ---------------------
+def load_manifest(cache_dir=MERGE_CACHE_DIR):
+    # {absolute path: {"size", "mtime_ns", "sha1", "options", "shard", "rows"}}
+    path = os.path.join(cache_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except ValueError:
+        return {}  # Cut short by an interrupted run; every file is parsed again
+
+
+def save_manifest(manifest, cache_dir=MERGE_CACHE_DIR):
+    path = os.path.join(cache_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+def _is_unchanged(entry, path, options, cache_dir):
+    # Same size and mtime is trusted as-is; otherwise the bytes decide, so a
+    # file that was copied or touched without changing is not parsed again.
+    if not entry or entry["options"] != options or not os.path.exists(os.path.join(cache_dir, entry["shard"])):
+        return False
+    stat = os.stat(path)
+    if (entry["size"], entry["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+        return True
+    if entry["size"] == stat.st_size and entry["sha1"] == content_hash(path):
+        entry["mtime_ns"] = stat.st_mtime_ns
+        return True
+    return False
+
+
+# ---------------------
+# 💾 Shards
+# ---------------------
+def _store_shard(cache_dir, key, frame):
+    # Parquet, or pickle for mixed-type columns Arrow cannot store.
+    shard = _digest(key)
+    for stale in (shard + ".parquet", shard + ".pkl"):
+        if os.path.exists(os.path.join(cache_dir, stale)):
+            os.remove(os.path.join(cache_dir, stale))
+    try:
+        frame.to_parquet(os.path.join(cache_dir, shard + ".parquet.tmp"), index=False)
+        os.replace(os.path.join(cache_dir, shard + ".parquet.tmp"), os.path.join(cache_dir, shard + ".parquet"))
+        return shard + ".parquet"
+    except Exception:
+        if os.path.exists(os.path.join(cache_dir, shard + ".parquet.tmp")):
+            os.remove(os.path.join(cache_dir, shard + ".parquet.tmp"))
+        frame.to_pickle(os.path.join(cache_dir, shard + ".pkl"))
+        return shard + ".pkl"
+
+
+def _load_shard(cache_dir, shard):
+    path = os.path.join(cache_dir, shard)
+    return pd.read_parquet(path) if shard.endswith(".parquet") else pd.read_pickle(path)
+
+
+# ---------------------
+# ♻️ Incremental Read
+# ---------------------
+def read_workbooks_cached(paths, max_workers=READ_WORKERS, cache_dir=MERGE_CACHE_DIR, **read_options):
+    # Drop-in for excel_reader.read_workbooks on folders that are merged again
+    # and again: yields (path, DataFrame) in the order given, but only new or
+    # changed workbooks are parsed (in the process pool). The rest come from
+    # the shard cached when they were last parsed. Each frame is yielded as
+    # soon as it is ready, so the caller holds one at a time, not the batch.
+    # Manifest entries for files that no longer exist are dropped along with
+    # their shards.
+    paths = list(paths)
+    if not cache_dir:
+        yield from read_workbooks(paths, max_workers, **read_options)
+        return
+
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = load_manifest(cache_dir)
+    options = _digest(sorted(read_options.items()))
+
+    changed = [path for path in paths if not _is_unchanged(manifest.get(os.path.abspath(path)), path, options, cache_dir)]
+    print(f"♻️ {len(paths) - len(changed)} unchanged workbook(s) from {cache_dir}, {len(changed)} to parse")
+
+    for key in [key for key in manifest if not os.path.exists(key)]:
+        shard = os.path.join(cache_dir, manifest.pop(key)["shard"])
+        if os.path.exists(shard):
+            os.remove(shard)
+
+    # Changed files come back from the pool in the same relative order, so
+    # they interleave with the cached ones without buffering either.
+    parsed = read_workbooks(changed, max_workers, **read_options)
+    to_parse = set(changed)
+    try:
+        for path in paths:
+            key = os.path.abspath(path)
+            if path not in to_parse:
+                yield path, _load_shard(cache_dir, manifest[key]["shard"])
+                continue
+
+            _, frame = next(parsed)
+            stat = os.stat(path)
+            manifest[key] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha1": content_hash(path),
+                "options": options,
+                "shard": _store_shard(cache_dir, key, frame),
+                "rows": len(frame),
+            }
+            yield path, frame
+    finally:
+        parsed.close()
+        save_manifest(manifest, cache_dir)
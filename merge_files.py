@@ -1,8 +1,7 @@
 import os
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import Font, PatternFill
-from openpyxl.utils import get_column_letter
+from excel_writer import SKY_BLUE_HEADER, column_widths, write_frame
+from merge_cache import MERGE_CACHE_DIR, read_workbooks_cached
 
 # === CONFIGURATION ===
 folder_path = 'your_folder_path_here'  # 🔁 Change this to your folder path
@@ -13,7 +12,7 @@ log_file = os.path.join(folder_path, 'merge_log.txt')
 log_lines = []
 
 # === STEP 1: Get All Excel Files ===
-excel_files = [f for f in os.listdir(folder_path) if f.endswith(('.xlsx', '.xls'))]
+excel_files = [f for f in os.listdir(folder_path) if f.endswith(('.xlsx', '.xls')) and f != output_file]
 log_lines.append(f"Number of Excel files found: {len(excel_files)}")
 
 if len(excel_files) == 0:
@@ -23,16 +22,19 @@ if len(excel_files) == 0:
     exit()
 
 # === STEP 2: Check If All Files Have Same Columns ===
-first_df = pd.read_excel(os.path.join(folder_path, excel_files[0]))
-expected_columns = list(first_df.columns)
-log_lines.append(f"Expected columns: {expected_columns}")
+paths = [os.path.join(folder_path, file) for file in excel_files]
+expected_columns = None
 
 all_dataframes = []
 row_counts = {}
 
-for file in excel_files:
-    path = os.path.join(folder_path, file)
-    df = pd.read_excel(path)
+# Only new or changed workbooks are parsed; the rest come from the merge cache.
+# Parsed in this process (max_workers=1): worker processes need a __main__ guard.
+for file, (_, df) in zip(excel_files, read_workbooks_cached(paths, max_workers=1,
+                                                           cache_dir=os.path.join(folder_path, MERGE_CACHE_DIR))):
+    if expected_columns is None:
+        expected_columns = list(df.columns)
+        log_lines.append(f"Expected columns: {expected_columns}")
 
     if list(df.columns) != expected_columns:
         log_lines.append(f"❌ Column mismatch in file: {file}")
@@ -48,28 +50,11 @@ for file in excel_files:
 # === STEP 3: Merge All DataFrames ===
 merged_df = pd.concat(all_dataframes, ignore_index=True)
 output_path = os.path.join(folder_path, output_file)
-merged_df.to_excel(output_path, index=False)
 
-# === STEP 4: Apply Excel Formatting ===
-wb = load_workbook(output_path)
-ws = wb.active
-
-# Make header bold and blue
-header_fill = PatternFill(start_color='87CEEB', end_color='87CEEB', fill_type='solid')
-for cell in ws[1]:
-    cell.font = Font(bold=True)
-    cell.fill = header_fill
-
-# Auto-fit column width
-for col in ws.columns:
-    max_length = max((len(str(cell.value)) for cell in col if cell.value), default=0)
-    col_letter = get_column_letter(col[0].column)
-    ws.column_dimensions[col_letter].width = max_length + 2
-
-# Add autofilter and freeze header row
-ws.auto_filter.ref = ws.dimensions
-ws.freeze_panes = 'A2'
-wb.save(output_path)
+# === STEP 4: Write Formatted Excel ===
+# Bold sky-blue header, auto-fit widths, autofilter and frozen header row, applied while writing
+write_frame(merged_df, output_path, header_format=SKY_BLUE_HEADER, widths=column_widths(merged_df),
+            freeze_header=True, autofilter=True)
 
 # === STEP 5: Write Log File ===
 log_lines.append("\nRow counts per file:")
@@ -0,0 +1,301 @@
+from azure.mgmt.cosmosdb import CosmosDBManagementClient
+from azure.mgmt.keyvault import KeyVaultManagementClient
+from azure.mgmt.storage import StorageManagementClient
+
+from resource_graph import fetch_keyvaults, fetch_storage_accounts
+from resource_index import get_vault_from_cache, lookup_cosmos_account, lookup_storage_account
+
+# ---------------------
+# 🗂️ Resource Types
+# ---------------------
+# How the engine finds one resource of each type: the input column holding its
+# name, the management client, the name → (resource group, id, ...) lookup, the
+# subscription listing the pre-flight snapshot uses and, where supported, the
+# Resource Graph bulk fetch and the property-carrying listing used by batch mode.
+RESOURCE_TYPES = {
+    "storage": {
+        "name_column": "Storage Account Name",
+        "label": "storage accounts",
+        "client": StorageManagementClient,
+        "lookup": lookup_storage_account,
+        "list": lambda client, **options: client.storage_accounts.list(**options),
+        "graph_fetch": fetch_storage_accounts,
+        "batch_list": None,
+        "not_found": "Storage Account not found",
+    },
+    "keyvault": {
+        "name_column": "Key Vault Name",
+        "label": "vaults",
+        "client": KeyVaultManagementClient,
+        "lookup": get_vault_from_cache,
+        "list": lambda client, **options: client.vaults.list(**options),
+        "graph_fetch": fetch_keyvaults,
+        "batch_list": None,
+        "not_found": "Key Vault not found",
+    },
+    "cosmosdb": {
+        "name_column": "Cosmos DB Name",
+        "label": "Cosmos DB accounts",
+        "client": CosmosDBManagementClient,
+        "lookup": lookup_cosmos_account,
+        "list": lambda client, **options: client.database_accounts.list(**options),
+        "graph_fetch": None,
+        "batch_list": lambda client, **options: client.database_accounts.list(**options),
+        "not_found": "Cosmos DB account not found",
+    },
+}
+
+CHECKS = {}
+
+
+def register_check(name, resource_type, fetch, columns, partial_file, final_file, graph=False, batch=None):
+    # Registers the decorated extractor as a check. fetch(client, rg_name, name)
+    # returns what the extractor needs; extract(resource) returns the values for
+    # `columns`. graph=True means the extractor also accepts the full resource
+    # model from a Resource Graph sweep, so fetch is skipped in graph mode.
+    # batch(listed) is True when a model from the resource type's batch_list
+    # carries every field the extractor reads; batch mode then evaluates the
+    # check from the listing and only calls fetch for resources where it is False.
+    def decorator(extract):
+        CHECKS[name] = {
+            "name": name,
+            "resource_type": resource_type,
+            "fetch": fetch,
+            "extract": extract,
+            "columns": columns,
+            "partial_file": partial_file,
+            "final_file": final_file,
+            "graph": graph,
+            "batch": batch,
+        }
+        return extract
+    return decorator
+
+
+# ---------------------
+# 📡 Fetch Calls
+# ---------------------
+def get_vault(client, rg_name, kv_name):
+    return client.vaults.get(rg_name, kv_name)
+
+
+def get_storage_properties(client, rg_name, sa_name):
+    return client.storage_accounts.get_properties(rg_name, sa_name)
+
+
+def list_blob_containers(client, rg_name, sa_name):
+    # (name, public_access) per container, projected page by page
+    return [(c.name, c.public_access) for c in client.blob_containers.list(rg_name, sa_name)]
+
+
+def get_cosmos_account(client, rg_name, acc_name):
+    return client.database_accounts.get(rg_name, acc_name)
+
+
+# ---------------------
+# 🔐 Key Vault Checks
+# ---------------------
+@register_check("keyvault_rbac", "keyvault", get_vault,
+                ["RBAC Enabled?", "Access Control Type", "Access Policy Count",
+                 "Access Policy Object IDs", "Access Policy Permissions"],
+                "keyvault_rbac_output_partial.xlsx", "keyvault_rbac_output.xlsx", graph=True)
+def check_keyvault_rbac(vault):
+    props = vault.properties
+    rbac_enabled = props.enable_rbac_authorization if props.enable_rbac_authorization else False
+    entry = {
+        "RBAC Enabled?": "Yes ✅" if rbac_enabled else "No ❌",
+        "Access Control Type": "RBAC" if rbac_enabled else "Access Policy",
+    }
+
+    if not rbac_enabled:
+        policies = props.access_policies or []
+        object_ids = [p.object_id for p in policies if p.object_id]
+        perms = []
+
+        for p in policies:
+            if hasattr(p.permissions, 'keys'):
+                perms += p.permissions.keys or []
+            if hasattr(p.permissions, 'secrets'):
+                perms += p.permissions.secrets or []
+            if hasattr(p.permissions, 'certificates'):
+                perms += p.permissions.certificates or []
+
+        entry["Access Policy Count"] = len(policies)
+        entry["Access Policy Object IDs"] = ", ".join(object_ids)
+        entry["Access Policy Permissions"] = ", ".join(sorted(set(perms)))
+
+    return entry
+
+
+@register_check("keyvault_recoverable", "keyvault", get_vault,
+                ["Soft Delete Enabled?", "Purge Protection?", "Retention Days", "Recoverable?"],
+                "keyvault_recoverable_output_partial.xlsx", "keyvault_recoverable_output.xlsx", graph=True)
+def check_keyvault_recoverable(vault):
+    props = vault.properties
+    soft_delete = props.enable_soft_delete if props.enable_soft_delete is not None else False
+    purge_protect = props.enable_purge_protection if props.enable_purge_protection is not None else False
+    retention_days = props.soft_delete_retention_in_days if props.soft_delete_retention_in_days is not None else "Unknown"
+
+    return {
+        "Soft Delete Enabled?": "Yes ✅" if soft_delete else "No ❌",
+        "Purge Protection?": "Yes ✅" if purge_protect else "No ❌",
+        "Retention Days": retention_days,
+        "Recoverable?": "Yes ✅" if soft_delete else "No ❌",
+    }
+
+
+@register_check("keyvault_firewall", "keyvault", get_vault,
+                ["Default Action", "Bypass", "Firewall Enabled?"],
+                "keyvault_firewall_output_partial.xlsx", "keyvault_firewall_output.xlsx", graph=True)
+def check_keyvault_firewall(vault):
+    network_acls = vault.properties.network_acls
+    default_action = network_acls.default_action if network_acls else "Unknown"
+    bypass = network_acls.bypass if network_acls else "Unknown"
+
+    return {
+        "Default Action": default_action,
+        "Bypass": bypass,
+        "Firewall Enabled?": "Yes ✅" if default_action == "Deny" else "No ❌",
+    }
+
+
+@register_check("keyvault_private_endpoint", "keyvault", get_vault,
+                ["Private Endpoint Configured?"],
+                "keyvault_private_endpoint_partial.xlsx", "keyvault_private_endpoint_output.xlsx", graph=True)
+def check_keyvault_private_endpoint(vault):
+    private_endpoints = vault.properties.private_endpoint_connections or []
+    return {"Private Endpoint Configured?": "Yes 🔒" if private_endpoints else "No 🌐"}
+
+
+@register_check("keyvault_network", "keyvault", get_vault,
+                ["Network ACLs", "Private Endpoints", "Public Network Access"],
+                "keyvault_output_partial.xlsx", "keyvault_output.xlsx", graph=True)
+def check_keyvault_network(vault):
+    props = vault.properties
+    return {
+        "Network ACLs": str(props.network_acls.as_dict() if props.network_acls else ""),
+        "Private Endpoints": str([pe.as_dict() for pe in (props.private_endpoint_connections or [])]),
+        "Public Network Access": str(props.public_network_access),
+    }
+
+
+# ---------------------
+# 💾 Storage Account Checks
+# ---------------------
+@register_check("storage_blob_public", "storage", list_blob_containers,
+                ["Public Blob Containers Found?", "Container Names (Public)"],
+                "storage_blob_public_partial.xlsx", "storage_blob_public_output.xlsx")
+def check_storage_blob_public(containers):
+    public_containers = [name for name, public_access in containers if public_access]
+    if public_containers:
+        return {"Public Blob Containers Found?": "Yes 🌐", "Container Names (Public)": ", ".join(public_containers)}
+    return {"Public Blob Containers Found?": "No 🔒"}
+
+
+@register_check("storage_account_public", "storage", get_storage_properties,
+                ["Public Access Allowed at Account Level?"],
+                "storage_account_public_partial.xlsx", "storage_account_public_output.xlsx", graph=True)
+def check_storage_account_public(props):
+    return {"Public Access Allowed at Account Level?": "Yes 🌐" if props.allow_blob_public_access else "No 🔒"}
+
+
+@register_check("storage_private_endpoint", "storage", get_storage_properties,
+                ["Private Endpoint Configured?", "Private Endpoint Names"],
+                "storage_pe_missing_partial.xlsx", "storage_pe_missing_output.xlsx", graph=True)
+def check_storage_private_endpoint(props):
+    pe_names = [pe.name for pe in (props.private_endpoint_connections or [])]
+    return {
+        "Private Endpoint Configured?": "Yes 🔒" if pe_names else "No 🌐",
+        "Private Endpoint Names": ", ".join(pe_names),
+    }
+
+
+@register_check("storage_cmk", "storage", get_storage_properties,
+                ["Encryption Type", "Key Vault URI", "CMK Enabled?"],
+                "storage_not_cmk_partial.xlsx", "storage_not_cmk_output.xlsx", graph=True)
+def check_storage_cmk(props):
+    enc = props.encryption
+    if enc and enc.key_source == "Microsoft.Keyvault":
+        return {
+            "Encryption Type": "CMK",
+            "Key Vault URI": enc.key_vault_properties.key_vault_uri if enc.key_vault_properties else "",
+            "CMK Enabled?": "Yes 🔐",
+        }
+    return {"Encryption Type": "Microsoft-Managed", "Key Vault URI": "", "CMK Enabled?": "No ❌"}
+
+
+@register_check("storage_infra_encryption", "storage", get_storage_properties,
+                ["Infrastructure Encryption Enabled?"],
+                "storage_no_infra_enc_partial.xlsx", "storage_no_infra_enc_output.xlsx", graph=True)
+def check_storage_infra_encryption(props):
+    infra_encryption = getattr(props.encryption, "require_infrastructure_encryption", False)
+    return {"Infrastructure Encryption Enabled?": "Yes ✅" if infra_encryption else "No ❌"}
+
+
+def register_logging_check(name, service_attr, label, partial_file, final_file):
+    # Blob, queue and table logging checks differ only in the service they read.
+    def get_service_properties(client, rg_name, sa_name):
+        return getattr(client, service_attr).get_service_properties(rg_name, sa_name)
+
+    @register_check(name, "storage", get_service_properties,
+                    [f"{label} Logging Enabled?", "Logging Operations Enabled"], partial_file, final_file)
+    def check_logging(service_props):
+        logging = service_props.logging
+        enabled_ops = [op for op in ("read", "write", "delete") if getattr(logging, op)]
+        return {
+            f"{label} Logging Enabled?": "Yes ✅" if enabled_ops else "No ❌",
+            "Logging Operations Enabled": ", ".join(enabled_ops),
+        }
+
+
+register_logging_check("storage_blob_logging", "blob_services", "Blob",
+                       "storage_blob_logging_partial.xlsx", "storage_blob_logging_output.xlsx")
+register_logging_check("storage_queue_logging", "queue_services", "Queue",
+                       "storage_queue_logging_partial.xlsx", "storage_queue_logging_output.xlsx")
+register_logging_check("storage_table_logging", "table_services", "Table",
+                       "storage_table_logging_partial.xlsx", "storage_table_logging_output.xlsx")
+
+
+# ---------------------
+# 🌍 Cosmos DB Checks
+# ---------------------
+def extract_vnet_subnet_name(vnet_rule_id):
+    try:
+        parts = vnet_rule_id.split('/')
+        vnet = parts[parts.index('virtualNetworks') + 1]
+        subnet = parts[parts.index('subnets') + 1]
+        return f"{vnet}/{subnet}"
+    except Exception:
+        return vnet_rule_id
+
+
+def cosmos_network_listed(account):
+    # The database_accounts listing returns the same network properties as get;
+    # an account missing any of them (e.g. still provisioning) is re-read with
+    # get, since a missing rule list would otherwise read as "no rules".
+    return (account.public_network_access is not None and account.ip_rules is not None
+            and account.virtual_network_rules is not None)
+
+
+@register_check("cosmosdb_public_access", "cosmosdb", get_cosmos_account,
+                ["Public Network Access", "IP Rules Count", "IP Rule Details",
+                 "VNet Rules Count", "VNet Rule Details", "Exposed to All Networks?"],
+                "cosmosdb_public_access_partial.xlsx", "cosmosdb_public_access_output.xlsx",
+                batch=cosmos_network_listed)
+def check_cosmosdb_public_access(props):
+    public_access = props.public_network_access or "Enabled"
+    ip_rules = props.ip_rules or []
+    vnet_rules = props.virtual_network_rules or []
+
+    ip_list = [r.ip_address_or_range for r in ip_rules]
+    contains_open_ip = "0.0.0.0" in ip_list
+    exposed = public_access == "Enabled" and (contains_open_ip or (len(ip_rules) == 0 and len(vnet_rules) == 0))
+
+    return {
+        "Public Network Access": public_access,
+        "IP Rules Count": len(ip_rules),
+        "IP Rule Details": ", ".join(ip_list),
+        "VNet Rules Count": len(vnet_rules),
+        "VNet Rule Details": ", ".join([extract_vnet_subnet_name(r.id) for r in vnet_rules if r.id]),
+        "Exposed to All Networks?": "Yes 🌐" if exposed else "No 🔒",
+    }
@@ -0,0 +1,333 @@
+import ast
+import os
+import time
+
+import pandas as pd
+from azure.core.exceptions import ClientAuthenticationError
+
+from arm_cache import get_cache, set_max_age
+from arm_clients import get_client, get_credential
+from concurrent_fetch import MAX_WORKERS, run_in_order
+from pid_checks import CHECKS, RESOURCE_TYPES
+from resource_graph import lookup_graph_resource
+from resource_index import lookup
+from resource_snapshot import SNAPSHOT_FILE, build_snapshot, load_snapshot, resolve_rows, snapshot_is_fresh
+from result_journal import ResultJournal, journal_path
+
+# ---------------------
+# ⚙️ Defaults
+# ---------------------
+SAVE_EVERY = 100  # fsync each policy's result journal every N rows
+COLLECTION_MODE = "arm"  # "arm" = per-resource ARM GETs, "graph" = one Resource Graph sweep, "batch" = one ARM listing per subscription
+CACHE_MAX_AGE_HOURS = None  # Reuse cached ARM snapshots younger than this (None = arm_cache default, --max-age wins)
+
+
+# ---------------------
+# 🔐 Azure CLI Login Check
+# ---------------------
+def login_check():
+    try:
+        credential = get_credential()
+        credential.get_token("https://management.azure.com/.default")
+    except ClientAuthenticationError:
+        print("⚠️ Azure CLI session expired or not logged in.")
+        print("👉 Please run 'az login' and rerun this script.")
+        raise SystemExit(1)
+
+
+# ---------------------
+# 🧾 Load Input and Resume State
+# ---------------------
+def load_input(input_file, sheet_name):
+    df = pd.read_excel(input_file, sheet_name=sheet_name)
+    df.columns = df.columns.str.strip()
+    df['Policy ID'] = df['Policy ID'].apply(lambda x: str(x).strip())
+    return df
+
+
+def load_journal(run):
+    # Streams the policy's journal back into memory. A partial .xlsx left by an
+    # older run is imported into the journal once, then the journal takes over.
+    journal = run["journal"]
+    name_column = run["resource_type"]["name_column"]
+
+    if not journal.exists() and os.path.exists(run["partial_file"]):
+        for record in pd.read_excel(run["partial_file"]).to_dict(orient='records'):
+            journal.append(record)
+        journal.sync()
+
+    for record in journal.read():
+        run["results"].append(record)
+        run["processed"].add((str(record[name_column]).strip().lower(), str(record['Subscription ID']).strip().lower()))
+
+    run["processed_count"] = len(run["results"])
+    if run["results"]:
+        print(f"🔁 Resuming {run['check']['name']} from {len(run['processed'])} processed {run['resource_type']['label']}.")
+
+
+def save_results(results, path):
+    pd.DataFrame(results).to_excel(path, index=False)
+
+
+# ---------------------
+# 🔍 Check One Resource
+# ---------------------
+def new_entry(check, sub_id, name):
+    entry = {
+        "Index": "",
+        "Subscription ID": sub_id,
+        RESOURCE_TYPES[check["resource_type"]]["name_column"]: name,
+        "Resource Group": "",
+    }
+    entry.update({column: "" for column in check["columns"]})
+    entry.update({"Status": "", "Message": ""})
+    return entry
+
+
+def batch_lookup(check, client, sub_id, name):
+    # (resource_group, id, columns) from one paged listing per subscription and
+    # check, evaluated page by page. columns is None where the listing lacks a
+    # field the check reads, and the caller falls back to fetch.
+    list_resources = RESOURCE_TYPES[check["resource_type"]]["batch_list"]
+
+    def project(resource):
+        try:
+            return check["extract"](resource) if check["batch"](resource) else None
+        except Exception:
+            return None
+
+    return lookup(f"{check['name']}_listing", sub_id, name, lambda **options: list_resources(client, **options),
+                  project=project)
+
+
+def run_check(check, sub_id, name, graph_resources=None, batch=False, ref=None):
+    # graph_resources is the Resource Graph result for this resource type when
+    # the check runs in graph mode; batch=True evaluates the check from the
+    # subscription's listing. Otherwise the resource is found through the
+    # shared subscription index and fetched with the check's own ARM call.
+    # ref is what the pre-flight snapshot resolved: (resource_group, id) skips
+    # the lookup, False (the snapshot listed the subscription and the resource
+    # is not there) is reported as not found without any call, and None (the
+    # subscription was not listed) falls back to the live lookup.
+    resource_type = RESOURCE_TYPES[check["resource_type"]]
+    entry = new_entry(check, sub_id, name)
+
+    try:
+        if graph_resources is not None:
+            ref = lookup_graph_resource(graph_resources, sub_id, name)
+        else:
+            client = get_client(resource_type["client"], sub_id)
+            if batch:
+                ref = batch_lookup(check, client, sub_id, name)
+            elif ref is None:
+                ref = resource_type["lookup"](client, sub_id, name)
+
+        if not ref:
+            entry["Status"] = "Failed"
+            entry["Message"] = resource_type["not_found"]
+        else:
+            rg_name = ref[0]
+            entry["Resource Group"] = rg_name
+
+            if batch and ref[2] is not None:
+                entry.update(ref[2])
+            else:
+                if graph_resources is not None:
+                    resource = ref[2]
+                else:
+                    resource = check["fetch"](client, rg_name, name)
+
+                entry.update(check["extract"](resource))
+            entry["Status"] = "Success"
+            entry["Message"] = "Processed successfully"
+
+    except ClientAuthenticationError:
+        raise
+    except Exception as e:
+        entry["Status"] = "Failed"
+        entry["Message"] = str(e)
+
+    return entry
+
+
+# ---------------------
+# 🛰️ Resource Graph Prefetch
+# ---------------------
+def prefetch_graph(runs):
+    # One sweep per resource type, scoped to every subscription any
+    # graph-capable policy needs.
+    subscriptions = {}
+    for run in runs:
+        if run["check"]["graph"] and run["resource_type"]["graph_fetch"]:
+            sub_ids = run["rows"]['Subscription ID'].astype(str).str.strip()
+            subscriptions.setdefault(run["check"]["resource_type"], set()).update(sub_ids)
+
+    return {
+        type_name: RESOURCE_TYPES[type_name]["graph_fetch"](sorted(sub_ids))
+        for type_name, sub_ids in subscriptions.items()
+    }
+
+
+# ---------------------
+# 🚀 Run Policies
+# ---------------------
+def run_policies(input_file, sheet_name, policies, save_every=SAVE_EVERY, max_workers=MAX_WORKERS,
+                 collection_mode=COLLECTION_MODE, cache_max_age=CACHE_MAX_AGE_HOURS, snapshot_file=SNAPSHOT_FILE,
+                 refresh_snapshot=False):
+    # policies is a list of {"policy_id", "check"[, "partial_file", "final_file"]}.
+    # The input workbook is read once, every policy's rows share one worker pool
+    # and one resource index, and each policy keeps its own journal and output file.
+    # Results are appended to the journal as they arrive; each xlsx is written once.
+    # ARM-mode fetches go through the on-disk snapshot cache (arm_cache.py), so a
+    # resource already read by an earlier policy today is a local read, and a
+    # fresh pre-flight snapshot (resource_snapshot.py) resolves names without
+    # any per-row lookup. refresh_snapshot=True rebuilds a missing or stale one
+    # first, after the login check.
+    login_check()
+    if cache_max_age is not None:
+        set_max_age(cache_max_age)
+    start_time = time.time()
+
+    df = load_input(input_file, sheet_name)
+    print(f"\n📊 Total entries: {len(df)}")
+
+    runs = []
+    for policy in policies:
+        check = CHECKS[policy["check"]]
+        policy_id = str(policy["policy_id"]).strip()
+        rows = df[df['Policy ID'] == policy_id].reset_index(drop=True)
+        print(f"🔎 Matching Policy ID '{policy_id}' ({check['name']}): {len(rows)}")
+
+        if rows.empty:
+            continue
+
+        partial_file = policy.get("partial_file") or check["partial_file"]
+        run = {
+            "check": check,
+            "resource_type": RESOURCE_TYPES[check["resource_type"]],
+            "rows": rows,
+            "partial_file": partial_file,
+            "final_file": policy.get("final_file") or check["final_file"],
+            "journal": ResultJournal(journal_path(partial_file), save_every),
+            "results": [],
+            "processed": set(),
+            "processed_count": 0,
+        }
+        load_journal(run)
+        runs.append(run)
+
+    if not runs:
+        print("⚠️ No matching rows. Exiting.")
+        raise SystemExit(1)
+
+    if refresh_snapshot and snapshot_file and not snapshot_is_fresh(snapshot_file):
+        build_snapshot(snapshot_file, max_workers=max_workers)
+    snapshot = load_snapshot(snapshot_file)
+    if snapshot is not None:
+        print(f"📸 Resolving resource names against {snapshot_file}")
+
+    pending = []
+    for run in runs:
+        name_column = run["resource_type"]["name_column"]
+        rows = run["rows"]
+        if snapshot is not None:
+            refs = resolve_rows(snapshot, run["check"]["resource_type"], rows['Subscription ID'], rows[name_column])
+        else:
+            refs = [None] * len(rows)
+
+        for (_, row), ref in zip(rows.iterrows(), refs):
+            sub_id = str(row['Subscription ID']).strip()
+            name = str(row[name_column]).strip()
+            pair_key = (name.lower(), sub_id.lower())
+
+            if pair_key in run["processed"]:
+                continue
+
+            run["processed"].add(pair_key)
+            pending.append((run, sub_id, name, ref))
+
+    graph = prefetch_graph(runs) if collection_mode == "graph" else {}
+
+    def check_pending(item):
+        # Checks without graph / batch support run as plain ARM checks in those modes.
+        run, sub_id, name, ref = item
+        check = run["check"]
+        graph_resources = graph.get(check["resource_type"]) if check["graph"] else None
+        batch = collection_mode == "batch" and bool(check["batch"] and run["resource_type"]["batch_list"])
+        return run_check(check, sub_id, name, graph_resources, batch, ref)
+
+    print(f"\n🚀 Checking {len(pending)} resources for {len(runs)} policies with {max_workers} worker(s)")
+
+    try:
+        for (run, sub_id, name, _), entry in run_in_order(pending, check_pending, max_workers):
+            run["processed_count"] += 1
+            entry["Index"] = run["processed_count"]
+            status_icon = "✅" if entry["Status"] == "Success" else "❌"
+            print(f"🔍 [{run['check']['name']} {run['processed_count']} of {len(run['rows'])}] "
+                  f"'{name}' in subscription '{sub_id}' → {status_icon} {entry['Message']}")
+
+            run["results"].append(entry)
+
+            if run["journal"].append(entry):
+                print(f"💾 Synced {run['processed_count']} rows → {run['journal'].path}")
+    except ClientAuthenticationError:
+        print("\n⛔ CLI session expired")
+        for run in runs:
+            run["journal"].close()
+            print(f"💾 Progress kept in → {run['journal'].path}")
+        print("👉 Run 'az login' and rerun this script.")
+        raise SystemExit(1)
+
+    # ---------------------
+    # ✅ Final Save
+    # ---------------------
+    for run in runs:
+        run["journal"].close()
+        save_results(run["results"], run["final_file"])
+        print(f"\n📁 Final output saved to: {run['final_file']}")
+
+    # ---------------------
+    # ⏱️ Execution Time
+    # ---------------------
+    elapsed = time.time() - start_time
+    h, m, s = int(elapsed // 3600), int((elapsed % 3600) // 60), round(elapsed % 60, 2)
+    if get_cache() is not None:
+        print(get_cache().summary())
+    print(f"\n⏱️ Execution time: {h} hours, {m} minutes, {s} seconds")
+    print("✅ All policies processed.")
+
+
+def run_policy(check, policy_id, input_file, sheet_name, partial_file=None, final_file=None, **options):
+    # Single-policy entry point used by the PID_*.py scripts.
+    policy = {"policy_id": policy_id, "check": check, "partial_file": partial_file, "final_file": final_file}
+    run_policies(input_file, sheet_name, [policy], **options)
+
+
+# ---------------------
+# 📜 Policies from the PID_*.py Scripts
+# ---------------------
+def read_policy_script(path):
+    # {"policy_id", "check", "partial_file", "final_file"} from a PID_*.py
+    # script's config block and its run_policy(...) call. The scripts run
+    # their check as soon as they are imported, so the source is parsed.
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    config, check = {}, None
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            try:
+                config[node.targets[0].id] = ast.literal_eval(node.value)
+            except ValueError:
+                pass
+        elif isinstance(node, ast.Call) and getattr(node.func, "id", None) == "run_policy" and node.args:
+            check = ast.literal_eval(node.args[0])
+
+    if check is None or "POLICY_FILTER_VALUE" not in config:
+        raise ValueError(f"{path} has no POLICY_FILTER_VALUE or run_policy(...) call")
+    return {
+        "policy_id": str(config["POLICY_FILTER_VALUE"]).strip(),
+        "check": check,
+        "partial_file": config.get("PARTIAL_OUTPUT_FILE"),
+        "final_file": config.get("FINAL_OUTPUT_FILE"),
+    }
@@ -1,7 +1,5 @@
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import PatternFill
-from openpyxl.utils import get_column_letter
+from excel_writer import SKY_BLUE_HEADER, column_widths, write_sheet
 
 # 1. Define Excel file paths for each Business Unit (BU)
 files = {
@@ -54,42 +52,13 @@ for bu in ['BU1', 'BU2', 'BU3', 'BU4']:
 # 6. Add a Total Count column (sum of all BU counts)
 merged_df['Total Count'] = merged_df[['BU1', 'BU2', 'BU3', 'BU4']].sum(axis=1)
 
-# 7. Save merged data and summary to Excel (2 sheets)
+# 7. Save merged data and summary to Excel (2 sheets), formatted as they are written:
+#    sky-blue headers and auto-fit widths on both, frozen header and filter on Policy Data
 output_file = "Combined_Policy_Counts_With_Summary.xlsx"
-with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-    merged_df.to_excel(writer, index=False, sheet_name='Policy Data')
-    pd.DataFrame(summary_data).to_excel(writer, index=False, sheet_name='Summary')
-
-# 8. Excel formatting using openpyxl
-wb = load_workbook(output_file)
-
-# === Format Policy Data Sheet ===
-ws = wb['Policy Data']
-ws.freeze_panes = 'A2'  # Freeze header row
-header_fill = PatternFill(start_color='87CEEB', end_color='87CEEB', fill_type='solid')  # Sky blue fill
-
-for col_num, cell in enumerate(ws[1], 1):
-    cell.fill = header_fill
-    # Auto-fit column width
-    max_length = max(
-        len(str(cell.value)) if cell.value else 0,
-        max((len(str(ws.cell(row=i, column=col_num).value)) for i in range(2, ws.max_row + 1)), default=0)
-    )
-    ws.column_dimensions[get_column_letter(col_num)].width = max_length + 2
-
-ws.auto_filter.ref = ws.dimensions  # Enable filter on all columns
-
-# === Format Summary Sheet ===
-summary_ws = wb['Summary']
-for col_num, cell in enumerate(summary_ws[1], 1):
-    cell.fill = header_fill
-    max_length = max(
-        len(str(cell.value)) if cell.value else 0,
-        max((len(str(summary_ws.cell(row=i, column=col_num).value)) for i in range(2, summary_ws.max_row + 1)), default=0)
-    )
-    summary_ws.column_dimensions[get_column_letter(col_num)].width = max_length + 2
-
-# 9. Save final Excel file
-wb.save(output_file)
+summary_df = pd.DataFrame(summary_data)
+with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
+    write_sheet(writer, merged_df, 'Policy Data', header_format=SKY_BLUE_HEADER, widths=column_widths(merged_df),
+                freeze_header=True, autofilter=True)
+    write_sheet(writer, summary_df, 'Summary', header_format=SKY_BLUE_HEADER, widths=column_widths(summary_df))
 
 print(f"✅ Final Excel file with Policy Data and Summary saved as '{output_file}'")
@@ -0,0 +1,113 @@
+import glob
+import hashlib
+import os
+
+import pandas as pd
+
+# ---------------------
+# ⚙️ Defaults
+# ---------------------
+REFERENCE_CACHE_DIR = ".reference_cache"  # Parsed reference sheets, one file per (workbook version, sheet); None disables
+KEY_FORMAT = 2  # Part of every entry's version; bumped when normalize_keys changes
+
+
+# ---------------------
+# 🔑 Cache Keys
+# ---------------------
+def _digest(*parts):
+    return hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:16]
+
+
+def _entry_prefix(path, sheet, key_columns):
+    # Stable for one (workbook, sheet, key columns); the file version is a suffix
+    # so older versions of the same sheet can be found and removed.
+    return os.path.join(REFERENCE_CACHE_DIR, _digest(os.path.abspath(path), sheet, sorted(key_columns)))
+
+
+def _entry_version(path):
+    stat = os.stat(path)
+    return _digest(stat.st_mtime_ns, stat.st_size, KEY_FORMAT)
+
+
+# ---------------------
+# 🧹 Normalisation
+# ---------------------
+def normalize_keys(keys):
+    # Join keys as stripped strings; blanks stay missing so they never match.
+    # A numeric key column with a blank is read as float, so whole numbers are
+    # written through Int64 first: 123.0 becomes "123", as it does unblanked.
+    if pd.api.types.is_float_dtype(keys) and keys.dropna().mod(1).eq(0).all():
+        keys = keys.astype("Int64")
+    return keys.astype(str).str.strip().where(keys.notna())
+
+
+def normalize_reference(frame, key_columns=()):
+    # Headers stripped, key columns through normalize_keys, the shape every
+    # enrichment script joins on.
+    frame.columns = [str(column).strip() for column in frame.columns]
+    for column in key_columns:
+        if column in frame.columns:
+            frame[column] = normalize_keys(frame[column])
+    return frame
+
+
+# ---------------------
+# 💾 Load / Store
+# ---------------------
+def _load(prefix, version):
+    for extension, reader in ((".parquet", pd.read_parquet), (".pkl", pd.read_pickle)):
+        entry = f"{prefix}_{version}{extension}"
+        if os.path.exists(entry):
+            try:
+                return reader(entry)
+            except Exception:
+                os.remove(entry)  # Unreadable (e.g. cut short); parse the workbook again
+    return None
+
+
+def _store(prefix, version, frame):
+    for stale in glob.glob(f"{prefix}_*"):
+        os.remove(stale)
+
+    entry = f"{prefix}_{version}"
+    try:
+        frame.to_parquet(entry + ".parquet.tmp", index=False)
+        os.replace(entry + ".parquet.tmp", entry + ".parquet")
+    except Exception:
+        # No Parquet engine, or mixed-type columns Arrow cannot store
+        if os.path.exists(entry + ".parquet.tmp"):
+            os.remove(entry + ".parquet.tmp")
+        frame.to_pickle(entry + ".pkl.tmp")
+        os.replace(entry + ".pkl.tmp", entry + ".pkl")
+
+
+# ---------------------
+# 📚 Cached read_excel
+# ---------------------
+def read_reference(path, sheet_name=0, key_columns=()):
+    # Drop-in for pd.read_excel(path, sheet_name=...) on slow-changing reference
+    # workbooks: a frame for one sheet, {sheet: frame} for a list of sheets.
+    # Sheets are served from the cache while the workbook's mtime and size are
+    # unchanged; all missing sheets are parsed together in one read_excel call.
+    sheets = sheet_name if isinstance(sheet_name, list) else [sheet_name]
+    version = _entry_version(path)
+
+    frames, missing = {}, []
+    for sheet in sheets:
+        cached = _load(_entry_prefix(path, sheet, key_columns), version) if REFERENCE_CACHE_DIR else None
+        if cached is None:
+            missing.append(sheet)
+        else:
+            frames[sheet] = cached
+
+    if missing:
+        print(f"📄 Parsing {os.path.basename(path)} sheet(s) {missing}")
+        parsed = pd.read_excel(path, sheet_name=missing)
+        if REFERENCE_CACHE_DIR:
+            os.makedirs(REFERENCE_CACHE_DIR, exist_ok=True)
+        for sheet in missing:
+            frames[sheet] = normalize_reference(parsed[sheet], key_columns)
+            if REFERENCE_CACHE_DIR:
+                _store(_entry_prefix(path, sheet, key_columns), version, frames[sheet])
+
+    return frames if isinstance(sheet_name, list) else frames[sheet_name]
@@ -0,0 +1,131 @@
+import json
+import os
+
+from arm_clients import get_client
+from resource_index import resource_group_from_id
+
+# ---------------------
+# ⚙️ Defaults
+# ---------------------
+PAGE_SIZE = 1000  # Rows per Resource Graph page (service maximum)
+SUBSCRIPTION_BATCH = 1000  # Subscriptions scoped into one query request
+RESOURCE_GRAPH_FIXTURE = os.environ.get("RESOURCE_GRAPH_FIXTURE")  # JSON file standing in for the service
+
+KEYVAULT_QUERY = """Resources
+| where type =~ "microsoft.keyvault/vaults"
+| project id, name, type, location, tags, properties, subscriptionId, resourceGroup"""
+
+STORAGE_ACCOUNT_QUERY = """Resources
+| where type =~ "microsoft.storage/storageaccounts"
+| project id, name, type, location, tags, sku, kind, properties, subscriptionId, resourceGroup"""
+
+# Ordered by subscription so callers can stream one subscription's VMs at a time.
+VIRTUAL_MACHINE_QUERY = """Resources
+| where type =~ "microsoft.compute/virtualmachines"
+| project id, name, type, location, zones, tags, identity, properties, subscriptionId, resourceGroup
+| order by subscriptionId asc, id asc"""
+
+NETWORK_INTERFACE_QUERY = """Resources
+| where type =~ "microsoft.network/networkinterfaces" and isnotempty(properties.virtualMachine.id)
+| project id, name, type, properties, subscriptionId"""
+
+PUBLIC_IP_QUERY = """Resources
+| where type =~ "microsoft.network/publicipaddresses" and isnotempty(properties.ipAddress)
+| project id, name, type, properties, subscriptionId"""
+
+
+# ---------------------
+# 📄 Paged Query
+# ---------------------
+def _fixture_pages(fixture_path):
+    # A fixture holds one QueryResponse-shaped page ({"data": [...], "$skipToken": ...})
+    # or a list of them; pages are followed through their skip tokens like the service.
+    with open(fixture_path, encoding="utf-8") as f:
+        pages = json.load(f)
+    if isinstance(pages, dict):
+        pages = [pages]
+    for page in pages:
+        yield page.get("data", []), page.get("$skipToken")
+
+
+def _service_pages(query, subscription_ids):
+    from azure.mgmt.resourcegraph import ResourceGraphClient
+    from azure.mgmt.resourcegraph.models import QueryRequest, QueryRequestOptions
+
+    client = get_client(ResourceGraphClient)
+    batches = [None] if not subscription_ids else [
+        subscription_ids[i:i + SUBSCRIPTION_BATCH] for i in range(0, len(subscription_ids), SUBSCRIPTION_BATCH)
+    ]
+
+    for batch in batches:
+        skip_token = None
+        while True:
+            options = QueryRequestOptions(result_format="objectArray", top=PAGE_SIZE, skip_token=skip_token)
+            response = client.resources(QueryRequest(subscriptions=batch, query=query, options=options))
+            yield response.data, response.skip_token
+            skip_token = response.skip_token
+            if not skip_token:
+                break
+
+
+def query_resource_graph(query, subscription_ids=None, fixture=None):
+    # Yields every result row across all pages. subscription_ids=None queries
+    # every subscription the credential can see.
+    fixture = fixture or RESOURCE_GRAPH_FIXTURE
+    if fixture:
+        pages = _fixture_pages(fixture)
+    else:
+        pages = _service_pages(query, list(subscription_ids) if subscription_ids else None)
+
+    for page_number, (rows, skip_token) in enumerate(pages, start=1):
+        print(f"🛰️ Resource Graph page {page_number}: {len(rows)} rows")
+        yield from rows
+        if not skip_token:
+            break
+
+
+# ---------------------
+# 🗂️ Name-Keyed Results
+# ---------------------
+def _to_model(model_cls, row):
+    if hasattr(model_cls, "deserialize"):
+        return model_cls.deserialize(row)  # msrest-generated SDKs
+    return model_cls(row)  # typespec-generated SDKs take the REST JSON mapping
+
+
+def rest_dict(model):
+    # The inverse: REST-shaped JSON (the same layout Resource Graph returns)
+    # from an SDK model of either generation.
+    return model.serialize(keep_readonly=True) if hasattr(model, "serialize") else model.as_dict()
+
+
+def fetch_resources(query, resource_type, model_cls=None, subscription_ids=None, fixture=None):
+    # Returns {(subscription_lower, name_lower): (resource_group, id, resource)}, the
+    # same shape as get_vault_from_cache(), where resource is the SDK model (or the
+    # raw row when model_cls is None) carrying the full ARM properties.
+    resources = {}
+    for row in query_resource_graph(query, subscription_ids, fixture):
+        if str(row.get("type", "")).lower() != resource_type:
+            continue
+        sub_id = row.get("subscriptionId") or row["id"].split("/")[2]
+        rg_name = row.get("resourceGroup") or resource_group_from_id(row["id"])
+        resource = _to_model(model_cls, row) if model_cls else row
+        resources[(sub_id.lower(), row["name"].lower())] = (rg_name, row["id"], resource)
+    print(f"🛰️ Resource Graph returned {len(resources)} {resource_type} resources")
+    return resources
+
+
+def fetch_keyvaults(subscription_ids=None, fixture=None, raw=False):
+    from azure.mgmt.keyvault.models import Vault
+    return fetch_resources(KEYVAULT_QUERY, "microsoft.keyvault/vaults",
+                           None if raw else Vault, subscription_ids, fixture)
+
+
+def fetch_storage_accounts(subscription_ids=None, fixture=None, raw=False):
+    from azure.mgmt.storage.models import StorageAccount
+    return fetch_resources(STORAGE_ACCOUNT_QUERY, "microsoft.storage/storageaccounts",
+                           None if raw else StorageAccount, subscription_ids, fixture)
+
+
+def lookup_graph_resource(resources, subscription_id, name):
+    return resources.get((subscription_id.lower(), name.lower()))
@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+import time
+
+# ---------------------
+# ⚙️ Defaults
+# ---------------------
+INDEX_CACHE_DIR = ".resource_index"  # One JSON file per (resource kind, subscription)
+INDEX_TTL_HOURS = 12  # Reuse on-disk listings across runs on the same day (0 = memory only)
+
+_indexes = {}
+_disk_loaded = set()
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+# ---------------------
+# 🧩 Helpers
+# ---------------------
+def resource_group_from_id(resource_id):
+    parts = resource_id.split("/")
+    return parts[[p.lower() for p in parts].index("resourcegroups") + 1]
+
+
+def _index_lock(key):
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def _cache_path(kind, subscription_id):
+    return os.path.join(INDEX_CACHE_DIR, f"{kind}_{subscription_id.lower()}.json")
+
+
+def _load_from_disk(kind, subscription_id):
+    path = _cache_path(kind, subscription_id)
+    if INDEX_TTL_HOURS <= 0 or not os.path.exists(path):
+        return None
+    if time.time() - os.path.getmtime(path) > INDEX_TTL_HOURS * 3600:
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return {name: tuple(value) for name, value in json.load(f).items()}
+    except (OSError, ValueError):
+        return None
+
+
+def _save_to_disk(kind, subscription_id, index):
+    if INDEX_TTL_HOURS <= 0:
+        return
+    os.makedirs(INDEX_CACHE_DIR, exist_ok=True)
+    path = _cache_path(kind, subscription_id)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(path + ".tmp", path)
+
+
+def _build_index(list_resources, project=None, live=False):
+    # Walks the pager one page at a time and keeps only (resource_group, id) per
+    # name, plus project(resource) when given, so each page's SDK models are
+    # dropped as soon as it is indexed. live=True lists past the ARM cache.
+    if live:
+        from arm_cache import LIVE
+        pager = list_resources(**LIVE)
+    else:
+        pager = list_resources()
+
+    index = {}
+    for page in pager.by_page():
+        for resource in page:
+            entry = (resource_group_from_id(resource.id), resource.id)
+            index[resource.name.lower()] = entry + (project(resource),) if project else entry
+    return index
+
+
+# ---------------------
+# 📦 Subscription-Scoped Index
+# ---------------------
+def get_index(kind, subscription_id, list_resources, refresh=False, project=None):
+    # Returns {name_lower: (resource_group, resource_id)} for one subscription.
+    # Built once per run with a single paged listing (or loaded from disk while
+    # fresh); concurrent callers for the same subscription wait for one build.
+    # With project, each entry also carries project(listed resource); those
+    # indexes hold resource properties, so they stay in memory only.
+    key = (kind, subscription_id.lower())
+    if key in _indexes and not refresh:
+        return _indexes[key]
+
+    with _index_lock(key):
+        if key not in _indexes or (refresh and key in _disk_loaded):
+            index = None if refresh or project else _load_from_disk(kind, subscription_id)
+            if index is not None:
+                _disk_loaded.add(key)
+            else:
+                print(f"📦 Indexing {kind} in subscription: {subscription_id}")
+                index = _build_index(list_resources, project, live=refresh)
+                _disk_loaded.discard(key)
+                if not project:
+                    _save_to_disk(kind, subscription_id, index)
+            _indexes[key] = index
+    return _indexes[key]
+
+
+def lookup(kind, subscription_id, name, list_resources, project=None):
+    # Returns (resource_group, resource_id) or None. A miss against an index that
+    # came from disk triggers one live re-listing, so resources created since the
+    # last run are not reported as missing. That re-listing bypasses the ARM
+    # snapshot cache (arm_cache.LIVE), so it always reflects ARM as it is now.
+    # list_resources must accept the client call options LIVE passes.
+    key = (kind, subscription_id.lower())
+    found = get_index(kind, subscription_id, list_resources, project=project).get(name.lower())
+    if found is None and key in _disk_loaded:
+        found = get_index(kind, subscription_id, list_resources, refresh=True, project=project).get(name.lower())
+    return found
+
+
+def lookup_storage_account(client, subscription_id, account_name):
+    return lookup("storage_accounts", subscription_id, account_name, client.storage_accounts.list)
+
+
+def get_vault_from_cache(client, subscription_id, kv_name):
+    # Returns (resource_group, vault_id) or None.
+    return lookup("vaults", subscription_id, kv_name, client.vaults.list)
+
+
+def lookup_cosmos_account(client, subscription_id, account_name):
+    return lookup("database_accounts", subscription_id, account_name, client.database_accounts.list)
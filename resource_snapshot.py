@@ -0,0 +1,104 @@
+import os
+import time
+
+import pandas as pd
+
+from arm_cache import LIVE
+from arm_clients import get_client
+from concurrent_fetch import run_in_order
+from pid_checks import RESOURCE_TYPES
+from resource_index import resource_group_from_id
+
+# ---------------------
+# ⚙️ Defaults
+# ---------------------
+SNAPSHOT_FILE = "resource_snapshot.parquet"  # Every storage account, vault and Cosmos account in the tenant
+SNAPSHOT_MAX_AGE_HOURS = 12  # Checkers ignore an older snapshot and resolve names live
+MAX_WORKERS = 16  # (subscription, resource type) listings in flight
+
+COLUMNS = ["resource_type", "subscription_id", "name", "resource_group", "resource_id"]
+
+
+# ---------------------
+# 📸 Build the Snapshot
+# ---------------------
+def list_subscriptions():
+    from azure.mgmt.resource import SubscriptionClient
+    return [sub.subscription_id for sub in get_client(SubscriptionClient).subscriptions.list()]
+
+
+def list_resources(job):
+    # One row per resource, plus one marker row (name = None) recording that the
+    # listing succeeded, so an empty subscription still counts as covered. The
+    # listing bypasses the ARM snapshot cache, so the snapshot is as of its build.
+    type_name, subscription_id = job
+    client = get_client(RESOURCE_TYPES[type_name]["client"], subscription_id)
+    sub = subscription_id.lower()
+    try:
+        rows = [
+            (type_name, sub, resource.name.lower(), resource_group_from_id(resource.id), resource.id)
+            for resource in RESOURCE_TYPES[type_name]["list"](client, **LIVE)
+        ]
+    except Exception as e:
+        print(f"⚠️ Could not list {RESOURCE_TYPES[type_name]['label']} in {subscription_id}: {e}")
+        return []
+    return rows + [(type_name, sub, None, None, None)]
+
+
+def build_snapshot(path=SNAPSHOT_FILE, subscription_ids=None, max_workers=MAX_WORKERS):
+    # Lists every resource type in every subscription (all visible ones by
+    # default) in parallel and writes the names as one Parquet file.
+    start_time = time.time()
+    subscription_ids = subscription_ids or list_subscriptions()
+    jobs = [(type_name, sub_id) for sub_id in subscription_ids for type_name in RESOURCE_TYPES]
+    print(f"📸 Snapshotting {len(RESOURCE_TYPES)} resource types in {len(subscription_ids)} subscriptions")
+
+    rows = [row for _, job_rows in run_in_order(jobs, list_resources, max_workers) for row in job_rows]
+    snapshot = pd.DataFrame(rows, columns=COLUMNS).astype("string")
+    snapshot["resource_type"] = snapshot["resource_type"].astype("category")
+    snapshot.to_parquet(path + ".tmp", index=False)
+    os.replace(path + ".tmp", path)
+
+    print(f"📸 {snapshot['name'].notna().sum()} resources → {path} in {round(time.time() - start_time, 2)}s")
+    return snapshot
+
+
+def snapshot_is_fresh(path=SNAPSHOT_FILE, max_age_hours=SNAPSHOT_MAX_AGE_HOURS):
+    return bool(path) and os.path.exists(path) and time.time() - os.path.getmtime(path) <= max_age_hours * 3600
+
+
+def load_snapshot(path=SNAPSHOT_FILE, max_age_hours=SNAPSHOT_MAX_AGE_HOURS):
+    # The snapshot when it exists and is fresh enough, else None.
+    if not snapshot_is_fresh(path, max_age_hours):
+        if path and os.path.exists(path):
+            print(f"⚠️ {path} is older than {max_age_hours}h; resolving names live")
+        return None
+    return pd.read_parquet(path)
+
+
+# ---------------------
+# 🔗 Vectorised Join
+# ---------------------
+def resolve_rows(snapshot, type_name, sub_ids, names):
+    # For each input row returns (resource_group, resource_id) when the snapshot
+    # has the resource, False when the snapshot covers the subscription and the
+    # resource is not there, and None when the subscription was not listed.
+    # Only None is resolved live by the caller: the snapshot is listed live and
+    # trusted for SNAPSHOT_MAX_AGE_HOURS, so a False row costs no API call.
+    typed = snapshot[snapshot["resource_type"] == type_name]
+    keys = pd.DataFrame({
+        "subscription_id": pd.Series(sub_ids).astype(str).str.strip().str.lower().to_numpy(),
+        "name": pd.Series(names).astype(str).str.strip().str.lower().to_numpy(),
+    })
+    found = keys.merge(typed.dropna(subset=["name"]).drop_duplicates(["subscription_id", "name"]),
+                       on=["subscription_id", "name"], how="left")
+    covered = keys["subscription_id"].isin(typed["subscription_id"]).to_numpy()
+
+    return [
+        (rg, rid) if isinstance(rid, str) else (False if is_covered else None)
+        for rg, rid, is_covered in zip(found["resource_group"], found["resource_id"], covered)
+    ]
+
+
+if __name__ == "__main__":
+    build_snapshot()
@@ -0,0 +1,69 @@
+import json
+import os
+
+# ---------------------
+# ⚙️ Defaults
+# ---------------------
+FSYNC_EVERY = 100  # Flush + fsync the journal every N appended rows
+
+
+# ---------------------
+# 📓 Append-Only Result Journal
+# ---------------------
+def journal_path(partial_file):
+    # keyvault_rbac_output_partial.xlsx → keyvault_rbac_output_partial.jsonl
+    return os.path.splitext(partial_file)[0] + ".jsonl"
+
+
+class ResultJournal:
+    # One JSON object per line. Appends are buffered and made durable every
+    # fsync_every rows, so a checkpoint costs one batch instead of rewriting
+    # every row seen so far. A line cut short by a crash is skipped on read.
+    def __init__(self, path, fsync_every=FSYNC_EVERY):
+        self.path = path
+        self.fsync_every = fsync_every
+        self._file = None
+        self._unsynced = 0
+
+    def exists(self):
+        return os.path.exists(self.path) and os.path.getsize(self.path) > 0
+
+    def read(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def append(self, record):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+            if self._file.tell() and not self._ends_with_newline():
+                self._file.write("\n")  # Seal a line left half-written by a crash
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self.sync()
+            return True
+        return False
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def sync(self):
+        if self._file is None or not self._unsynced:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
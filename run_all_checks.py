@@ -0,0 +1,40 @@
+import glob
+
+from pid_engine import read_policy_script, run_policies
+
+# ---------------------
+# 📥 Config
+# ---------------------
+INPUT_FILE = "policy_input.xlsx"  # One sheet with every policy's rows (and each type's name column)
+SHEET_NAME = "Sheet1"
+SAVE_EVERY = 100  # Save each policy's progress every N rows
+MAX_WORKERS = 16  # Parallel checks across all policies (1 = sequential)
+COLLECTION_MODE = "arm"  # "arm" = per-resource ARM GETs, "graph" = one Resource Graph sweep, "batch" = one ARM listing per subscription
+CACHE_MAX_AGE_HOURS = 6  # Reuse ARM snapshots cached by earlier runs for this long (override with --max-age)
+SNAPSHOT_FILE = "resource_snapshot.parquet"  # Pre-flight name → resource group snapshot, shared with the PID_*.py scripts
+
+# Each PID_*.py script's POLICY_FILTER_VALUE, check and output files, read from
+# the script itself, so this sweep selects the same rows the script would.
+POLICY_SCRIPTS = sorted(glob.glob("PID_*.py"))
+
+# ---------------------
+# 📜 Policies
+# ---------------------
+policies = [read_policy_script(path) for path in POLICY_SCRIPTS]
+
+scripts_by_id = {}
+for path, policy in zip(POLICY_SCRIPTS, policies):
+    scripts_by_id.setdefault(policy["policy_id"], []).append(path)
+for policy_id, paths in scripts_by_id.items():
+    if len(paths) > 1:
+        print(f"⚠️ POLICY_FILTER_VALUE '{policy_id}' is set in {len(paths)} scripts ({', '.join(paths)}); "
+              f"each of their checks runs on the same rows")
+
+# ---------------------
+# 🚀 One Sweep for All Policies (the snapshot is rebuilt first when missing or stale)
+# ---------------------
+run_policies(
+    INPUT_FILE, SHEET_NAME, policies,
+    save_every=SAVE_EVERY, max_workers=MAX_WORKERS, collection_mode=COLLECTION_MODE,
+    cache_max_age=CACHE_MAX_AGE_HOURS, snapshot_file=SNAPSHOT_FILE, refresh_snapshot=True,
+)
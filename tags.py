@@ -1,15 +1,22 @@
+import asyncio
 import pandas as pd
 import os
 import time
-from azure.identity import AzureCliCredential
-from azure.core.exceptions import ClientAuthenticationError, HttpResponseError
+import xlsxwriter
+from azure.core.exceptions import ClientAuthenticationError
 from azure.mgmt.resource import SubscriptionClient, ResourceManagementClient
+from arm_clients import POOL_MAXSIZE, get_async_client, get_client, get_credential
+from result_journal import ResultJournal
 
 # ---------------------
 # 📥 Config
 # ---------------------
-PARTIAL_FILE = "azure_tags_partial.xlsx"
+PARTIAL_FILE = "azure_tags_partial.xlsx"  # Written by older runs; imported once on resume
+JOURNAL_FILE = "azure_tags_partial.jsonl"  # One line per completed subscription
 FINAL_FILE = "azure_subscription_and_rg_tags.xlsx"
+SWEEP_MODE = "async"  # "async" = concurrent .aio sweep, "sync" = one subscription at a time
+MAX_CONCURRENT_SUBSCRIPTIONS = 32  # Subscriptions in flight in async mode
+SYNC_EVERY = 25  # fsync the journal every N completed subscriptions
 
 # ---------------------
 # ⏱️ Timer Start
@@ -20,115 +27,186 @@ start_time = time.time()
 # 🔐 Azure CLI Login Check
 # ---------------------
 try:
-    credential = AzureCliCredential()
+    credential = get_credential()
     credential.get_token("https://management.azure.com/.default")
 except ClientAuthenticationError:
     raise SystemExit("⚠️ Azure CLI session expired. Please run 'az login' and rerun this script.")
 
 # ---------------------
-# 🔁 Load Partial Output if Exists
+# 🔁 Load Completed Subscriptions
 # ---------------------
-if os.path.exists(PARTIAL_FILE):
-    partial_df = pd.read_excel(PARTIAL_FILE, sheet_name=None)
-    subscription_data = partial_df.get("Subscription Tags", pd.DataFrame()).to_dict("records")
-    rg_tag_data = partial_df.get("Resource Group Tags", pd.DataFrame()).to_dict("records")
-    processed_subs = {row["Subscription ID"] for row in subscription_data}
-    print(f"🔁 Resuming from {len(processed_subs)} subscriptions")
-else:
-    subscription_data = []
-    rg_tag_data = []
-    processed_subs = set()
+journal = ResultJournal(JOURNAL_FILE, SYNC_EVERY)
 
-# ---------------------
-# 🔁 Retry Helper
-# ---------------------
-def retry_call(func, retries=3, delay=5):
-    for attempt in range(retries):
-        try:
-            return func()
-        except HttpResponseError as e:
-            print(f"⏳ Retry {attempt+1}/{retries} - {e}")
-            time.sleep(delay)
-    raise
+if not journal.exists() and os.path.exists(PARTIAL_FILE):
+    partial_df = {name: sheet.fillna("") for name, sheet in pd.read_excel(PARTIAL_FILE, sheet_name=None).items()}
+    rg_sheet = partial_df.get("Resource Group Tags", pd.DataFrame(columns=["Subscription ID"]))
+    rgs_by_sub = {sub_id: group.to_dict("records") for sub_id, group in rg_sheet.groupby("Subscription ID", sort=False)}
+    for position, sub_entry in enumerate(partial_df.get("Subscription Tags", pd.DataFrame()).to_dict("records")):
+        journal.append({
+            "position": position,
+            "subscription": sub_entry,
+            "resource_groups": rgs_by_sub.get(sub_entry["Subscription ID"], []),
+        })
+    journal.sync()
+
+processed_subs = {record["subscription"]["Subscription ID"] for record in journal.read()}
+if processed_subs:
+    print(f"🔁 Resuming from {len(processed_subs)} subscriptions")
 
 # ---------------------
-# 📦 Process Subscriptions and RG Tags
+# 🧩 Row Builders
 # ---------------------
-sub_client = SubscriptionClient(credential)
-all_subs = list(sub_client.subscriptions.list())
-total_subs = len(all_subs)
-total_rgs = 0
+def format_tags(tags):
+    return ", ".join(f"{k}={v}" for k, v in tags.items()) if tags else ""
 
-for idx, sub in enumerate(all_subs, start=1):
-    sub_id = sub.subscription_id
-    sub_name = sub.display_name
 
-    if sub_id in processed_subs:
-        continue
+def subscription_entry(sub_id, sub_name, sub_details=None, error=None):
+    return {
+        "Subscription ID": sub_id,
+        "Subscription Name": sub_name,
+        "Tags": "ERROR" if error else format_tags(sub_details.tags),
+        "Message": str(error) if error else "Success"
+    }
 
-    print(f"\n🔍 [{idx} of {total_subs}] Processing subscription: {sub_name} ({sub_id})")
 
-    sub_entry = {
+def rg_entry(sub_id, sub_name, rg):
+    return {
         "Subscription ID": sub_id,
         "Subscription Name": sub_name,
-        "Tags": "",
-        "Message": ""
+        "Resource Group": rg.name,
+        "Location": rg.location,
+        "Tags": format_tags(rg.tags),
+        "Message": "Success"
     }
 
-    try:
-        sub_details = retry_call(lambda: sub_client.subscriptions.get(sub_id))
-        if sub_details.tags:
-            sub_entry["Tags"] = ", ".join(f"{k}={v}" for k, v in sub_details.tags.items())
-        sub_entry["Message"] = "Success"
-    except Exception as e:
-        sub_entry["Tags"] = "ERROR"
-        sub_entry["Message"] = str(e)
-
-    subscription_data.append(sub_entry)
-
-    try:
-        rg_client = ResourceManagementClient(credential, sub_id)
-        rgs = list(rg_client.resource_groups.list())
-        print(f"📁   Found {len(rgs)} resource groups in {sub_name}")
-        for rg_idx, rg in enumerate(rgs, start=1):
-            rg_tags = rg.tags or {}
-            print(f"📦     - [{rg_idx} of {len(rgs)}] {rg.name}")
-            rg_tag_data.append({
-                "Subscription ID": sub_id,
-                "Subscription Name": sub_name,
-                "Resource Group": rg.name,
-                "Location": rg.location,
-                "Tags": ", ".join(f"{k}={v}" for k, v in rg_tags.items()) if rg_tags else "",
-                "Message": "Success"
-            })
-        total_rgs += len(rgs)
-    except Exception as e:
-        rg_tag_data.append({
+
+def rg_entries(sub_id, sub_name, rgs=None, error=None):
+    # rgs is consumed lazily, so each pager page is reduced to row dicts
+    # before the next one is fetched.
+    if error:
+        return [{
             "Subscription ID": sub_id,
             "Subscription Name": sub_name,
             "Resource Group": "ERROR",
             "Location": "",
             "Tags": "",
-            "Message": str(e)
-        })
+            "Message": str(error)
+        }]
+    return [rg_entry(sub_id, sub_name, rg) for rg in rgs]
 
-    with pd.ExcelWriter(PARTIAL_FILE, engine="xlsxwriter") as writer:
-        pd.DataFrame(subscription_data).to_excel(writer, sheet_name="Subscription Tags", index=False)
-        pd.DataFrame(rg_tag_data).to_excel(writer, sheet_name="Resource Group Tags", index=False)
-    print(f"💾 Partial saved after: {sub_name}")
+
+def record_subscription(position, sub_entry, rg_rows):
+    # A subscription is journaled as one line once all its rows are in, so the
+    # journal itself is the completed-subscription checkpoint.
+    journal.append({"position": position, "subscription": sub_entry, "resource_groups": rg_rows})
+    processed_subs.add(sub_entry["Subscription ID"])
+    found = "ERROR" if rg_rows and rg_rows[0]["Resource Group"] == "ERROR" else len(rg_rows)
+    print(f"📁 [{position + 1}] {sub_entry['Subscription Name']} ({sub_entry['Subscription ID']}) → {found} resource groups")
+
+# ---------------------
+# 🐢 Sync Sweep
+# ---------------------
+def sweep_sync():
+    sub_client = get_client(SubscriptionClient)
+    for position, sub in enumerate(sub_client.subscriptions.list()):
+        sub_id, sub_name = sub.subscription_id, sub.display_name
+        if sub_id in processed_subs:
+            continue
+
+        try:
+            sub_entry = subscription_entry(sub_id, sub_name, sub_client.subscriptions.get(sub_id))
+        except Exception as e:
+            sub_entry = subscription_entry(sub_id, sub_name, error=e)
+
+        try:
+            rg_client = get_client(ResourceManagementClient, sub_id)
+            rg_rows = rg_entries(sub_id, sub_name, rg_client.resource_groups.list())
+        except Exception as e:
+            rg_rows = rg_entries(sub_id, sub_name, error=e)
+
+        record_subscription(position, sub_entry, rg_rows)
+
+# ---------------------
+# ⚡ Async Sweep
+# ---------------------
+async def sweep_async():
+    import aiohttp
+    from azure.mgmt.resource.aio import ResourceManagementClient as AsyncResourceManagementClient
+    from azure.mgmt.resource.aio import SubscriptionClient as AsyncSubscriptionClient
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SUBSCRIPTIONS)
+
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=POOL_MAXSIZE)) as session:
+        sub_client = get_async_client(AsyncSubscriptionClient, session)
+
+        async def collect(position, sub_id, sub_name):
+            async with semaphore:
+                try:
+                    sub_entry = subscription_entry(sub_id, sub_name, await sub_client.subscriptions.get(sub_id))
+                except Exception as e:
+                    sub_entry = subscription_entry(sub_id, sub_name, error=e)
+
+                try:
+                    async with get_async_client(AsyncResourceManagementClient, session, sub_id) as rg_client:
+                        rg_rows = [rg_entry(sub_id, sub_name, rg) async for rg in rg_client.resource_groups.list()]
+                except Exception as e:
+                    rg_rows = rg_entries(sub_id, sub_name, error=e)
+
+            record_subscription(position, sub_entry, rg_rows)
+
+        async with sub_client:
+            tasks = []
+            position = 0
+            async for sub in sub_client.subscriptions.list():
+                if sub.subscription_id not in processed_subs:
+                    tasks.append(asyncio.create_task(collect(position, sub.subscription_id, sub.display_name)))
+                position += 1
+            print(f"🚀 Sweeping {len(tasks)} of {position} subscriptions, {MAX_CONCURRENT_SUBSCRIPTIONS} at a time")
+            await asyncio.gather(*tasks)
+
+# ---------------------
+# 📦 Process Subscriptions and RG Tags
+# ---------------------
+try:
+    if SWEEP_MODE == "async":
+        asyncio.run(sweep_async())
+    else:
+        sweep_sync()
+finally:
+    journal.close()
+    print(f"💾 Progress kept in → {JOURNAL_FILE}")
 
 # ---------------------
 # 📤 Final Save
 # ---------------------
-with pd.ExcelWriter(FINAL_FILE, engine="xlsxwriter") as writer:
-    pd.DataFrame(subscription_data).to_excel(writer, sheet_name="Subscription Tags", index=False)
-    pd.DataFrame(rg_tag_data).to_excel(writer, sheet_name="Resource Group Tags", index=False)
+def write_sheet(workbook, sheet_name, columns, rows, header_format):
+    worksheet = workbook.add_worksheet(sheet_name)
+    worksheet.write_row(0, 0, columns, header_format)
+    count = 0
+    for count, row in enumerate(rows, start=1):
+        worksheet.write_row(count, 0, [row.get(column, "") for column in columns])
+    return count
+
+
+# Subscriptions finish out of order; the report keeps the listing order.
+records = sorted(journal.read(), key=lambda record: record["position"])
+sub_columns = ["Subscription ID", "Subscription Name", "Tags", "Message"]
+rg_columns = ["Subscription ID", "Subscription Name", "Resource Group", "Location", "Tags", "Message"]
+
+workbook = xlsxwriter.Workbook(FINAL_FILE, {"constant_memory": True, "nan_inf_to_errors": True})
+header_format = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+total_subs = write_sheet(workbook, "Subscription Tags", sub_columns,
+                         (record["subscription"] for record in records), header_format)
+write_sheet(workbook, "Resource Group Tags", rg_columns,
+            (row for record in records for row in record["resource_groups"]), header_format)
+workbook.close()
+total_rgs = sum(1 for record in records for row in record["resource_groups"] if row["Resource Group"] != "ERROR")
 
 # ---------------------
 # ⏱️ Execution Time
 # ---------------------
 elapsed = time.time() - start_time
 h, m, s = int(elapsed // 3600), int((elapsed % 3600) // 60), round(elapsed % 60, 2)
-print(f"\n✅ Completed {len(subscription_data)} subscriptions and {total_rgs} resource groups")
+print(f"\n✅ Completed {total_subs} subscriptions and {total_rgs} resource groups")
 print(f"📁 Final output saved to: {FINAL_FILE}")
 print(f"⏱️ Completed in {h}h {m}m {s}s")
@@ -0,0 +1,111 @@
+import json
+import os
+import sys
+import time
+
+import pytest
+
+# The repo root holds standalone scripts, one of them named email.py, which
+# would shadow the stdlib package the Azure SDK imports. Load the real one
+# before the root goes on sys.path (run with `pytest`, not `python -m pytest`,
+# which puts the root first before anything is imported).
+import email.message  # noqa: F401
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import requests  # noqa: E402
+from azure.core.credentials import AccessToken  # noqa: E402
+from azure.core.pipeline.transport import HttpTransport  # noqa: E402
+from azure.core.rest._requests_basic import RestRequestsTransportResponse  # noqa: E402
+
+import arm_cache  # noqa: E402
+
+SUB = "00000000-0000-0000-0000-000000000001"
+ACCOUNT_ID = f"/subscriptions/{SUB}/resourceGroups/rg1/providers/Microsoft.Storage/storageAccounts/acct1"
+
+
+# ---------------------
+# 🧪 Fake ARM
+# ---------------------
+class FakeCredential:
+    def get_token(self, *scopes, **kwargs):
+        return AccessToken("token", int(time.time()) + 3600)
+
+
+class FakeArm(HttpTransport):
+    # Answers storage-account GETs and listings from self.accounts; records
+    # every URL that actually reached the wire.
+    def __init__(self):
+        self.calls = []
+        self.accounts = ["acct1"]
+        self.etag = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send(self, request, **kwargs):
+        assert "arm_cache" not in kwargs  # The option must never reach the transport
+        self.calls.append(request.url)
+        path = request.url.split("?")[0]
+        if path.endswith("/storageAccounts"):
+            body = {"value": [{"id": ACCOUNT_ID.replace("acct1", name), "name": name} for name in self.accounts]}
+        else:
+            body = {"id": ACCOUNT_ID, "name": "acct1", "properties": {"minimumTlsVersion": "TLS1_2"}}
+
+        if self.etag and request.headers.get("If-None-Match") == self.etag:
+            return make_response(request, 304, b"", {})
+        headers = {"ETag": self.etag} if self.etag else {}
+        return make_response(request, 200, json.dumps(body).encode(), headers)
+
+
+def make_response(request, status, body, headers):
+    internal = requests.Response()
+    internal.status_code = status
+    internal.url = request.url
+    internal.headers["Content-Type"] = "application/json"
+    internal.headers.update(headers)
+    internal._content = body
+    response = RestRequestsTransportResponse(request=request, internal_response=internal, block_size=4096)
+    response._content = body
+    response._is_closed = True
+    return response
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(arm_cache, "CACHE_FILE", str(tmp_path / "arm_cache.sqlite"))
+    monkeypatch.setattr(arm_cache, "_cache", None)
+    monkeypatch.setattr(arm_cache, "max_age_from_argv", lambda argv=None: None)
+    return arm_cache.get_cache()
+
+
+@pytest.fixture
+def arm():
+    return FakeArm()
+
+
+@pytest.fixture
+def storage_client(cache, arm):
+    # A storage client wired like arm_clients.get_client's, on the fake transport.
+    from azure.mgmt.storage import StorageManagementClient
+    return StorageManagementClient(FakeCredential(), SUB, transport=arm, **arm_cache.cache_policies())
+
+
+@pytest.fixture
+def fresh_index(tmp_path, monkeypatch):
+    # resource_index with an empty memory and its disk cache under tmp_path.
+    import resource_index
+    monkeypatch.setattr(resource_index, "INDEX_CACHE_DIR", str(tmp_path / "index"))
+    monkeypatch.setattr(resource_index, "_indexes", {})
+    monkeypatch.setattr(resource_index, "_disk_loaded", set())
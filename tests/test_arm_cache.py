@@ -0,0 +1,88 @@
+from azure.mgmt.storage import StorageManagementClient
+
+import arm_cache
+from conftest import ACCOUNT_ID, SUB, FakeCredential
+
+
+# ---------------------
+# 🔑 Keys and classification
+# ---------------------
+def test_cache_key_splits_api_version_and_keeps_other_parameters():
+    resource_id, api_version = arm_cache.cache_key(
+        f"https://management.azure.com{ACCOUNT_ID}/?api-version=2023-01-01&$expand=geoReplicationStats"
+    )
+    assert api_version == "2023-01-01"
+    assert resource_id == ACCOUNT_ID.lower() + "?%24expand=geoReplicationStats"
+
+
+def test_page_requests_and_listings_are_not_cacheable():
+    assert arm_cache.is_page_request("https://x/subscriptions/s/vaults?api-version=1&$skipToken=abc")
+    assert arm_cache.is_page_request("https://x/subscriptions/s/vaults?$skiptoken=abc")
+    assert not arm_cache.is_page_request("https://x/subscriptions/s/vaults/v1?api-version=1")
+
+    assert arm_cache.is_single_resource(b'{"id": "/x", "name": "x"}')
+    assert not arm_cache.is_single_resource(b'{"value": []}')
+    assert not arm_cache.is_single_resource(b'{"value": [], "nextLink": "https://x"}')
+    assert not arm_cache.is_single_resource(b"not json")
+
+
+# ---------------------
+# 🚦 Policy
+# ---------------------
+def test_single_resource_get_is_served_from_the_cache(cache, arm, storage_client):
+    first = storage_client.storage_accounts.get_properties("rg1", "acct1")
+    second = storage_client.storage_accounts.get_properties("rg1", "acct1")
+
+    assert len(arm.calls) == 1
+    assert second.name == first.name == "acct1"
+    assert cache.hits == 1
+
+
+def test_listings_always_reach_arm(cache, arm, storage_client):
+    assert [a.name for a in storage_client.storage_accounts.list()] == ["acct1"]
+
+    arm.accounts.append("acct2")  # Created after the first listing
+    assert [a.name for a in storage_client.storage_accounts.list()] == ["acct1", "acct2"]
+    assert len(arm.calls) == 2
+    assert cache.stored == 0
+
+
+def test_live_option_bypasses_a_fresh_snapshot(cache, arm, storage_client):
+    storage_client.storage_accounts.get_properties("rg1", "acct1")
+    storage_client.storage_accounts.get_properties("rg1", "acct1", **arm_cache.LIVE)
+
+    assert len(arm.calls) == 2
+    assert cache.hits == 0
+
+
+def test_stale_snapshot_is_revalidated_with_its_etag(cache, arm, storage_client):
+    arm.etag = '"v1"'
+    storage_client.storage_accounts.get_properties("rg1", "acct1")
+
+    cache.max_age = 0
+    account = storage_client.storage_accounts.get_properties("rg1", "acct1")
+
+    assert len(arm.calls) == 2
+    assert cache.revalidated == 1
+    assert account.minimum_tls_version == "TLS1_2"
+
+
+def test_live_option_is_accepted_with_the_cache_disabled(monkeypatch, arm):
+    monkeypatch.setattr(arm_cache, "CACHE_FILE", None)
+    monkeypatch.setattr(arm_cache, "_cache", None)
+    client = StorageManagementClient(FakeCredential(), SUB, transport=arm, **arm_cache.cache_policies())
+
+    assert [a.name for a in client.storage_accounts.list(**arm_cache.LIVE)] == ["acct1"]
+    client.storage_accounts.get_properties("rg1", "acct1")
+    client.storage_accounts.get_properties("rg1", "acct1")
+    assert len(arm.calls) == 3
+
+
+def test_cache_files_from_the_older_schema_start_empty(tmp_path):
+    path = str(tmp_path / "old.sqlite")
+    old = arm_cache.ArmCache(path)
+    old._db.execute("PRAGMA user_version = 1")
+    old.put(("/subscriptions/s/providers/x/list", "1"), b'{"value": []}', "application/json", None)
+    old._db.close()
+
+    assert arm_cache.ArmCache(path).get(("/subscriptions/s/providers/x/list", "1")) is None
@@ -0,0 +1,67 @@
+import pytest
+from azure.core.pipeline import PipelineResponse
+from azure.core.rest import HttpRequest
+
+import arm_throttle
+from conftest import make_response
+
+
+def server_error():
+    request = HttpRequest("GET", "https://management.azure.com/subscriptions/s/providers/x")
+    return PipelineResponse(request, make_response(request, 503, b"{}", {}), None)
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    budget = arm_throttle.RetryBudget(ratio=0, minimum=1)
+    monkeypatch.setattr(arm_throttle, "retry_budget", budget)
+    return budget
+
+
+def test_retry_that_azure_core_refuses_costs_no_budget(budget):
+    policy = arm_throttle.AdaptiveRetryPolicy()
+    settings = policy.configure_retries({})
+    settings["total"] = 0  # Exhausted: azure-core will not retry
+
+    assert policy.increment(settings, response=server_error()) is False
+    assert budget.retries == 0
+
+
+def test_budget_is_charged_per_retry_and_then_fails_fast(budget):
+    policy = arm_throttle.AdaptiveRetryPolicy()
+
+    assert policy.increment(policy.configure_retries({}), response=server_error()) is True
+    assert policy.increment(policy.configure_retries({}), response=server_error()) is False
+    assert budget.retries == 1
+
+
+def test_rate_halves_once_per_cooldown(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(arm_throttle.time, "monotonic", lambda: now[0])
+    bucket = arm_throttle.TokenBucket(rate=20, cooldown=5)
+
+    for _ in range(50):  # A burst of low-remaining responses
+        bucket.slow_down()
+    assert bucket.rate == 10
+
+    now[0] += 5
+    bucket.slow_down()
+    assert bucket.rate == 5
+
+
+def test_rate_recovers_to_the_configured_maximum():
+    bucket = arm_throttle.TokenBucket(rate=20)
+    bucket.slow_down()
+    for _ in range(100):
+        bucket.speed_up()
+    assert bucket.rate == 20
+
+
+def test_remaining_requests_reads_the_smallest_header_value():
+    headers = {
+        "x-ms-ratelimit-remaining-subscription-reads": "11990",
+        "x-ms-ratelimit-remaining-resource": "Microsoft.Compute/LowCostGet3Min;95,Microsoft.Compute/LowCostGet30Min;3996",
+        "Content-Type": "application/json",
+    }
+    assert arm_throttle.remaining_requests(headers) == 95
+    assert arm_throttle.subscription_scope("https://management.azure.com/subscriptions/ABC/x") == "abc"
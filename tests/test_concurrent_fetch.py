@@ -0,0 +1,44 @@
+import threading
+import time
+
+import pytest
+
+from concurrent_fetch import run_in_order
+
+
+def test_results_come_back_in_input_order():
+    def slow_for_early_items(item):
+        time.sleep((10 - item) * 0.002)
+        return item * item
+
+    results = list(run_in_order(range(10), slow_for_early_items, max_workers=4))
+
+    assert results == [(item, item * item) for item in range(10)]
+
+
+def test_sequential_mode_runs_on_the_calling_thread():
+    threads = {thread for _, thread in run_in_order(range(3), lambda _: threading.get_ident(), max_workers=1)}
+    assert threads == {threading.get_ident()}
+
+
+def test_in_flight_work_is_bounded():
+    started = []
+    results = run_in_order(range(100), lambda item: started.append(item) or item, max_workers=2)
+
+    assert next(results) == (0, 0)
+    time.sleep(0.05)
+    assert len(started) <= 2 * 2 + 1  # Only the queued window, not all 100
+
+
+def test_exception_is_raised_at_its_position():
+    def fail_on_three(item):
+        if item == 3:
+            raise ValueError("boom")
+        return item
+
+    seen = []
+    with pytest.raises(ValueError, match="boom"):
+        for item, _ in run_in_order(range(6), fail_on_three, max_workers=3):
+            seen.append(item)
+
+    assert seen == [0, 1, 2]
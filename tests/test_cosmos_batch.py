@@ -0,0 +1,58 @@
+import json
+
+import pytest
+from azure.mgmt.cosmosdb import CosmosDBManagementClient
+
+import arm_cache
+import pid_engine
+from conftest import SUB, FakeArm, FakeCredential, make_response
+from pid_checks import CHECKS
+
+ACCOUNT = f"/subscriptions/{SUB}/resourceGroups/rg1/providers/Microsoft.DocumentDB/databaseAccounts/cosmos1"
+VNET_RULE = {"id": f"/subscriptions/{SUB}/resourceGroups/rg1/providers/Microsoft.Network/virtualNetworks/vnet1/subnets/app"}
+
+
+class CosmosArm(FakeArm):
+    # The listing returns self.listed_properties; get returns the full account.
+    def __init__(self, listed_properties):
+        super().__init__()
+        self.listed_properties = listed_properties
+
+    def send(self, request, **kwargs):
+        self.calls.append(request.url)
+        full = {"publicNetworkAccess": "Enabled", "ipRules": [], "virtualNetworkRules": [VNET_RULE]}
+        if request.url.split("?")[0].endswith("/databaseAccounts"):
+            body = {"value": [{"id": ACCOUNT, "name": "cosmos1", "properties": self.listed_properties}]}
+        else:
+            body = {"id": ACCOUNT, "name": "cosmos1", "properties": full}
+        return make_response(request, 200, json.dumps(body).encode(), {})
+
+
+@pytest.fixture
+def run_batch(cache, fresh_index, monkeypatch):
+    def run(arm):
+        client = CosmosDBManagementClient(FakeCredential(), SUB, transport=arm, **arm_cache.cache_policies())
+        monkeypatch.setattr(pid_engine, "get_client", lambda client_cls, sub_id=None: client)
+        return pid_engine.run_check(CHECKS["cosmosdb_public_access"], SUB, "cosmos1", batch=True)
+    return run
+
+
+def test_listed_account_is_evaluated_without_a_get(run_batch):
+    arm = CosmosArm({"publicNetworkAccess": "Enabled", "ipRules": [], "virtualNetworkRules": [VNET_RULE]})
+    entry = run_batch(arm)
+
+    assert entry["Status"] == "Success"
+    assert entry["Resource Group"] == "rg1"
+    assert entry["VNet Rule Details"] == "vnet1/app"
+    assert entry["Exposed to All Networks?"] == "No 🔒"
+    assert len(arm.calls) == 1  # The listing only
+
+
+def test_account_listed_without_vnet_rules_falls_back_to_get(run_batch):
+    arm = CosmosArm({"publicNetworkAccess": "Enabled", "ipRules": []})
+    entry = run_batch(arm)
+
+    assert entry["VNet Rules Count"] == 1
+    assert entry["Exposed to All Networks?"] == "No 🔒"
+    assert len(arm.calls) == 2
+    assert arm.calls[1].split("?")[0].endswith("/databaseAccounts/cosmos1")
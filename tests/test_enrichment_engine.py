@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from enrichment_engine import apply_mappings, build_lookup, prepare_input
+from reference_cache import normalize_keys
+
+MAPPING = {
+    "name": "Anex1",
+    "sheet": "Anex1",
+    "key": "Policy ID",
+    "columns": {"Policy Statement": "Col1"},
+    "not_found_message": "Policy details doesn't exist",
+    "unmatched_log": None,
+}
+
+
+def test_normalize_keys_writes_whole_floats_as_integers():
+    assert normalize_keys(pd.Series([123.0, np.nan, 5.0])).tolist() == ["123", np.nan, "5"]
+    assert normalize_keys(pd.Series([123, 4])).tolist() == ["123", "4"]
+    assert normalize_keys(pd.Series([1.5, np.nan])).tolist() == ["1.5", np.nan]
+    assert normalize_keys(pd.Series([" a ", None])).tolist() == ["a", np.nan]
+
+
+def test_float_annex_keys_match_integer_input_keys():
+    # An integer key column with one blank cell is read as float.
+    annex = pd.DataFrame({"Policy ID": [123, np.nan, 456], "Policy Statement": ["s1", "blank", "s2"]})
+    annex["Policy ID"] = normalize_keys(annex["Policy ID"])
+    lookups = {"Anex1": build_lookup(annex, MAPPING)}
+    df = pd.DataFrame({"Policy ID": [123, 456, 789]})
+
+    df, unmatched = apply_mappings(df, [MAPPING], lookups)
+
+    assert df["Col1"].tolist() == ["s1", "s2", "Policy details doesn't exist"]
+    assert list(unmatched["Anex1"]) == ["789"]
+
+
+def test_chunk_with_only_blank_accounts_is_prepared():
+    chunk = pd.DataFrame({"Account": [np.nan, np.nan], "Resource ID": ["a/b", "c/d"]})
+
+    prepared = prepare_input(chunk, {}, report=False)
+
+    assert prepared["Subscription ID"].isna().all()
+    assert prepared["Resource ID"].tolist() == ["b", "d"]
+
+
+def test_account_column_is_split_into_subscription_id_and_name():
+    chunk = pd.DataFrame({"Account": ["sub-1 (My Sub)", np.nan]})
+
+    prepared = prepare_input(chunk, {}, report=False)
+
+    assert prepared["Subscription ID"].tolist()[0] == "sub-1"
+    assert prepared["Subscription Name"].tolist()[0] == "MySub"
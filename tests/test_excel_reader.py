@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from excel_reader import check_headers, read_header, read_workbooks
+
+
+def workbook(path, header, rows=1):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(header)
+    for _ in range(rows):
+        ws.append(list(range(len(header))))
+    wb.save(path)
+    return str(path)
+
+
+@pytest.mark.parametrize("header", [
+    ["A", "B", "C"],
+    ["A", "A", "B", "A"],
+    ["A", "A", "A.1"],
+    ["A.1", "A", "A"],
+    ["A", None, "B"],
+    ["Unnamed: 2", "a", None, None, "b"],
+    [1, 1, "x", "x"],
+])
+def test_header_probe_matches_read_excel(tmp_path, header):
+    path = workbook(tmp_path / "h.xlsx", header)
+    assert read_header(path) == list(pd.read_excel(path).columns)
+
+
+def test_trailing_blank_header_cells_are_dropped(tmp_path):
+    path = workbook(tmp_path / "h.xlsx", ["A", "B", None, None], rows=0)
+    assert read_header(path) == ["A", "B"]
+
+
+def test_check_headers_reports_mismatches_against_the_first_file(tmp_path):
+    same = [workbook(tmp_path / f"s{i}.xlsx", ["A", "A", "B"]) for i in range(2)]
+    other = workbook(tmp_path / "o.xlsx", ["A", "B"])
+
+    assert check_headers(same) == (True, ["A", "A.1", "B"], [])
+    assert check_headers(same + [other]) == (False, ["A", "A.1", "B"], [other])
+
+
+def test_read_workbooks_keeps_order(tmp_path):
+    paths = [workbook(tmp_path / f"f{i}.xlsx", ["A"], rows=i + 1) for i in range(3)]
+    assert [(path, len(frame)) for path, frame in read_workbooks(paths, max_workers=1)] == list(zip(paths, [1, 2, 3]))
@@ -0,0 +1,31 @@
+import datetime
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from excel_writer import SKY_BLUE_HEADER, WRAP_TOP_LEFT, column_widths, write_frame
+
+
+def test_every_data_cell_keeps_the_wrap_and_alignment(tmp_path):
+    path = tmp_path / "report.xlsx"
+    df = pd.DataFrame({
+        "Name": ["a", "b"],
+        "Count": [1, 2],
+        "Seen": pd.to_datetime(["2024-01-02 03:04:05", None]),
+        "Due": [datetime.date(2024, 5, 6), None],
+    })
+
+    write_frame(df, path, header_format={**SKY_BLUE_HEADER, **WRAP_TOP_LEFT}, cell_format=WRAP_TOP_LEFT,
+                widths=column_widths(df), freeze_header=True)
+
+    sheet = load_workbook(path).active
+    for cell in sheet[2]:
+        assert (cell.alignment.horizontal, cell.alignment.vertical, cell.alignment.wrap_text) == ("left", "top", True)
+    seen, due = sheet["C2"], sheet["D2"]
+    assert seen.value == datetime.datetime(2024, 1, 2, 3, 4, 5)
+    assert seen.number_format == "YYYY-MM-DD HH:MM:SS"
+    assert due.value == datetime.datetime(2024, 5, 6)
+    assert due.number_format == "YYYY-MM-DD"
+    assert sheet["C3"].value is None
+    assert sheet["A1"].fill.fgColor.rgb.endswith("87CEEB")
+    assert sheet.freeze_panes == "A2"
@@ -0,0 +1,32 @@
+import pandas as pd
+
+from frame_collector import FrameCollector
+
+
+def frames():
+    return [pd.DataFrame({"B": [f"b{i}", f"c{i}"], "A": [i, i], "Extra": ["x", None]}) for i in range(4)]
+
+
+def test_result_keeps_add_order_and_puts_columns_first():
+    collector = FrameCollector(columns=["A", "B"])
+    for frame in frames():
+        collector.add(frame)
+
+    merged = collector.result()
+
+    assert list(merged.columns) == ["A", "B", "Extra"]
+    assert merged["A"].tolist() == [0, 0, 1, 1, 2, 2, 3, 3]
+    assert merged["B"].tolist()[:3] == ["b0", "c0", "b1"]
+    assert collector.rows == 8
+
+
+def test_mixed_type_columns_are_kept_as_read():
+    collector = FrameCollector()
+    collector.add(pd.DataFrame({"A": [1, "two"]}))
+    collector.add(pd.DataFrame({"A": [3.0]}))
+
+    assert collector.result()["A"].tolist() == [1, "two", 3.0]
+
+
+def test_empty_collector_returns_the_expected_columns():
+    assert list(FrameCollector(columns=["A", "B"]).result().columns) == ["A", "B"]
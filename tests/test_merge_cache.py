@@ -0,0 +1,106 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import merge_cache
+
+
+@pytest.fixture
+def folder(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for i in range(3):
+        pd.DataFrame({"A": [i, i], "B": ["x", "y"]}).to_excel(f"f{i}.xlsx", index=False)
+    return tmp_path
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    # Paths read_workbooks actually parsed, in order.
+    seen = []
+    read_workbooks = merge_cache.read_workbooks
+
+    def recording(paths, max_workers, **read_options):
+        for path, frame in read_workbooks(paths, max_workers, **read_options):
+            seen.append(path)
+            yield path, frame
+
+    monkeypatch.setattr(merge_cache, "read_workbooks", recording)
+    return seen
+
+
+def merge(paths, **read_options):
+    return [(path, frame["A"].tolist()) for path, frame in
+            merge_cache.read_workbooks_cached(paths, max_workers=1, cache_dir="cache", **read_options)]
+
+
+PATHS = ["f0.xlsx", "f1.xlsx", "f2.xlsx"]
+
+
+def test_unchanged_workbooks_come_from_their_shards(folder, parsed):
+    first = merge(PATHS)
+    second = merge(PATHS)
+
+    assert first == second == [("f0.xlsx", [0, 0]), ("f1.xlsx", [1, 1]), ("f2.xlsx", [2, 2])]
+    assert parsed == PATHS
+
+
+def test_changed_workbook_is_parsed_again(folder, parsed):
+    merge(PATHS)
+    pd.DataFrame({"A": [9], "B": ["z"]}).to_excel("f1.xlsx", index=False)
+    parsed.clear()
+
+    assert merge(PATHS)[1] == ("f1.xlsx", [9])
+    assert parsed == ["f1.xlsx"]
+
+
+def test_touched_but_identical_workbook_is_not_parsed(folder, parsed):
+    merge(PATHS)
+    stat = os.stat("f2.xlsx")
+    os.utime("f2.xlsx", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    parsed.clear()
+
+    merge(PATHS)
+    assert parsed == []
+
+
+def test_read_options_are_part_of_the_identity(folder, parsed):
+    merge(PATHS)
+    parsed.clear()
+
+    assert merge(PATHS, usecols=["A"])[0] == ("f0.xlsx", [0, 0])
+    assert parsed == PATHS
+
+
+def test_deleted_workbook_is_dropped_from_the_manifest(folder, parsed):
+    merge(PATHS)
+    shard = merge_cache.load_manifest("cache")[os.path.abspath("f2.xlsx")]["shard"]
+    os.remove("f2.xlsx")
+
+    merge(PATHS[:2])
+
+    assert os.path.abspath("f2.xlsx") not in merge_cache.load_manifest("cache")
+    assert not os.path.exists(os.path.join("cache", shard))
+
+
+def test_results_are_yielded_as_they_are_parsed(folder, parsed):
+    merge(["f0.xlsx"])
+    parsed.clear()
+
+    results = merge_cache.read_workbooks_cached(PATHS, max_workers=1, cache_dir="cache")
+    assert next(results)[0] == "f0.xlsx"
+    assert parsed == []  # Cached f0 handed over before anything else is parsed
+    assert next(results)[0] == "f1.xlsx"
+    assert parsed == ["f1.xlsx"]  # f2 not parsed yet
+    results.close()
+
+
+def test_truncated_manifest_means_a_full_reparse(folder, parsed):
+    merge(PATHS)
+    with open(os.path.join("cache", merge_cache.MANIFEST_FILE), "w") as f:
+        f.write(json.dumps({"x": 1})[:-3])
+    parsed.clear()
+
+    merge(PATHS)
+    assert parsed == PATHS
@@ -0,0 +1,61 @@
+import glob
+import os
+
+import pytest
+
+from conftest import ROOT
+from pid_checks import CHECKS
+from pid_engine import read_policy_script
+
+SCRIPTS = sorted(glob.glob(os.path.join(ROOT, "PID_*.py")))
+
+
+@pytest.mark.parametrize("path", SCRIPTS, ids=os.path.basename)
+def test_every_pid_script_names_a_registered_check(path):
+    policy = read_policy_script(path)
+
+    assert policy["check"] in CHECKS
+    assert policy["policy_id"]
+    assert policy["final_file"].endswith(".xlsx")
+
+
+def test_policy_id_comes_from_the_scripts_filter_value(tmp_path):
+    script = tmp_path / "PID_42.py"
+    script.write_text(
+        'from pid_engine import run_policy\n'
+        'POLICY_FILTER_VALUE = 9001\n'
+        'FINAL_OUTPUT_FILE = "out.xlsx"\n'
+        'run_policy("storage_cmk", POLICY_FILTER_VALUE, "in.xlsx", "Sheet1", final_file=FINAL_OUTPUT_FILE)\n',
+        encoding="utf-8",
+    )
+
+    assert read_policy_script(str(script)) == {
+        "policy_id": "9001", "check": "storage_cmk", "partial_file": None, "final_file": "out.xlsx",
+    }
+
+
+def test_script_without_a_run_policy_call_is_rejected(tmp_path):
+    script = tmp_path / "PID_0.py"
+    script.write_text('POLICY_FILTER_VALUE = "1"\n', encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        read_policy_script(str(script))
+
+
+def test_stale_snapshot_is_rebuilt_once_after_the_login_check(tmp_path, monkeypatch):
+    import pandas as pd
+    import pid_engine
+
+    steps = []
+    monkeypatch.setattr(pid_engine, "login_check", lambda: steps.append("login"))
+    monkeypatch.setattr(pid_engine, "build_snapshot", lambda path, max_workers: steps.append("snapshot"))
+    monkeypatch.setattr(pid_engine, "load_snapshot", lambda path: None)
+    monkeypatch.setattr(pid_engine, "run_in_order", lambda items, fn, workers: iter(()))
+    monkeypatch.setattr(pid_engine, "get_cache", lambda: None)
+    monkeypatch.chdir(tmp_path)
+
+    pd.DataFrame({"Policy ID": ["1"], "Subscription ID": ["s"], "Storage Account Name": ["a"]}).to_excel("in.xlsx", index=False)
+    pid_engine.run_policies("in.xlsx", "Sheet1", [{"policy_id": "1", "check": "storage_cmk"}],
+                            snapshot_file=str(tmp_path / "missing.parquet"), refresh_snapshot=True)
+
+    assert steps == ["login", "snapshot"]
@@ -0,0 +1,56 @@
+import os
+
+import pandas as pd
+import pytest
+
+import reference_cache
+
+
+@pytest.fixture
+def parses(tmp_path, monkeypatch):
+    # Every sheet list pd.read_excel is asked to parse, with the cache under tmp_path.
+    monkeypatch.setattr(reference_cache, "REFERENCE_CACHE_DIR", str(tmp_path / "cache"))
+    calls = []
+    read_excel = pd.read_excel
+
+    def recording(path, sheet_name=0, **kwargs):
+        calls.append(sheet_name)
+        return read_excel(path, sheet_name=sheet_name, **kwargs)
+    monkeypatch.setattr(reference_cache.pd, "read_excel", recording)
+    return calls
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / "Remediation.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({" Policy ID ": [84, None, 111], "Policy Statement": ["a", "b", "c"]}).to_excel(writer, sheet_name="Main", index=False)
+        pd.DataFrame({"Owner": ["x"]}).to_excel(writer, sheet_name="Other", index=False)
+    return path
+
+
+def test_second_read_is_served_from_the_cache(parses, workbook):
+    first = reference_cache.read_reference(str(workbook), "Main", key_columns=["Policy ID"])
+    second = reference_cache.read_reference(str(workbook), "Main", key_columns=["Policy ID"])
+
+    assert parses == [["Main"]]
+    assert second["Policy ID"].fillna("").tolist() == first["Policy ID"].fillna("").tolist() == ["84", "", "111"]
+    assert list(second.columns) == ["Policy ID", "Policy Statement"]
+
+
+def test_missing_sheets_are_parsed_together(parses, workbook):
+    reference_cache.read_reference(str(workbook), "Main")
+    frames = reference_cache.read_reference(str(workbook), ["Main", "Other"])
+
+    assert parses == [["Main"], ["Other"]]
+    assert frames["Other"]["Owner"].tolist() == ["x"]
+
+
+def test_changed_workbook_is_parsed_again(parses, workbook):
+    reference_cache.read_reference(str(workbook), "Main")
+    pd.DataFrame({"Policy ID": [7]}).to_excel(workbook, sheet_name="Main", index=False)
+    os.utime(workbook, ns=(1, 1))
+
+    assert reference_cache.read_reference(str(workbook), "Main")["Policy ID"].tolist() == [7]
+    assert parses == [["Main"], ["Main"]]
+    assert len(os.listdir(reference_cache.REFERENCE_CACHE_DIR)) == 1  # The old version was removed
@@ -0,0 +1,94 @@
+import json
+
+import pandas as pd
+import pytest
+
+import pid_engine
+import resource_graph
+from conftest import SUB
+
+OTHER_SUB = "00000000-0000-0000-0000-000000000002"
+STORAGE_TYPE = "Microsoft.Storage/storageAccounts"
+
+
+def account_row(sub_id, name, public):
+    return {
+        "id": f"/subscriptions/{sub_id}/resourceGroups/rg-{name}/providers/{STORAGE_TYPE}/{name}",
+        "name": name,
+        "type": STORAGE_TYPE,
+        "subscriptionId": sub_id,
+        "resourceGroup": f"rg-{name}",
+        "properties": {"allowBlobPublicAccess": public},
+    }
+
+
+@pytest.fixture
+def graph_fixture(tmp_path, monkeypatch):
+    # Three pages chained by skip tokens, then one the service never returns
+    # because the page before it has no token.
+    pages = [
+        {"data": [account_row(SUB, "Acct1", True), {"id": "/x/vault", "name": "vault", "type": "Microsoft.KeyVault/vaults"}],
+         "$skipToken": "page2"},
+        {"data": [account_row(SUB, "acct2", False)], "$skipToken": "page3"},
+        {"data": [account_row(OTHER_SUB, "acct3", True)]},
+        {"data": [account_row(SUB, "unreachable", True)]},
+    ]
+    path = tmp_path / "graph.json"
+    path.write_text(json.dumps(pages), encoding="utf-8")
+    monkeypatch.setattr(resource_graph, "RESOURCE_GRAPH_FIXTURE", str(path))
+    return path
+
+
+# ---------------------
+# 📄 Paged Query
+# ---------------------
+def test_query_follows_skip_tokens_until_the_last_page(graph_fixture):
+    names = [row["name"] for row in resource_graph.query_resource_graph("Resources")]
+    assert names == ["Acct1", "vault", "acct2", "acct3"]
+
+
+def test_single_page_fixture(tmp_path):
+    path = tmp_path / "one.json"
+    path.write_text(json.dumps({"data": [account_row(SUB, "acct1", True)]}), encoding="utf-8")
+    assert len(list(resource_graph.query_resource_graph("Resources", fixture=str(path)))) == 1
+
+
+def test_fetch_resources_keys_by_subscription_and_name(graph_fixture):
+    resources = resource_graph.fetch_storage_accounts()
+
+    assert sorted(resources) == [(SUB, "acct1"), (SUB, "acct2"), (OTHER_SUB, "acct3")]
+    rg_name, resource_id, account = resource_graph.lookup_graph_resource(resources, SUB.upper(), "ACCT1")
+    assert rg_name == "rg-Acct1"
+    assert resource_id.endswith("/storageAccounts/Acct1")
+    assert account.allow_blob_public_access is True
+    assert resource_graph.lookup_graph_resource(resources, OTHER_SUB, "acct1") is None
+
+
+# ---------------------
+# 🛰️ Graph Collection Mode
+# ---------------------
+def test_graph_mode_joins_the_sweep_to_the_input_rows(graph_fixture, cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(pid_engine, "login_check", lambda: None)
+
+    def no_arm(*args, **kwargs):
+        raise AssertionError("graph mode must not build an ARM client")
+    monkeypatch.setattr(pid_engine, "get_client", no_arm)
+
+    input_file = tmp_path / "input.xlsx"
+    pd.DataFrame({
+        "Policy ID": ["84", "84", "84", "84", "99"],
+        "Subscription ID": [SUB, SUB, OTHER_SUB, OTHER_SUB, SUB],
+        "Storage Account Name": ["acct2", "ACCT1", "acct3", "acct1", "acct1"],
+    }).to_excel(input_file, sheet_name="Findings", index=False)
+    final_file = tmp_path / "out.xlsx"
+
+    pid_engine.run_policy("storage_account_public", "84", str(input_file), "Findings",
+                          partial_file=str(tmp_path / "partial.xlsx"), final_file=str(final_file),
+                          collection_mode="graph", snapshot_file=None)
+
+    out = pd.read_excel(final_file)
+    assert out["Storage Account Name"].tolist() == ["acct2", "ACCT1", "acct3", "acct1"]
+    assert out["Resource Group"].fillna("").tolist() == ["rg-acct2", "rg-Acct1", "rg-acct3", ""]
+    assert out["Public Access Allowed at Account Level?"].fillna("").tolist() == ["No 🔒", "Yes 🌐", "Yes 🌐", ""]
+    assert out["Status"].tolist() == ["Success", "Success", "Success", "Failed"]
+    assert out["Message"].iloc[3] == "Storage Account not found"
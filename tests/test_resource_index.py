@@ -0,0 +1,59 @@
+import pytest
+
+import resource_index
+from conftest import SUB
+
+pytestmark = pytest.mark.usefixtures("fresh_index")
+
+
+def new_run():
+    # What a later run starts with: nothing in memory, the listing on disk.
+    resource_index._indexes.clear()
+    resource_index._disk_loaded.clear()
+
+
+class Resource:
+    def __init__(self, name):
+        self.name = name
+        self.id = f"/subscriptions/{SUB}/resourceGroups/rg1/providers/Microsoft.Storage/storageAccounts/{name}"
+
+
+class Pager:
+    def __init__(self, resources):
+        self.resources = resources
+
+    def by_page(self):
+        return iter([self.resources])
+
+
+def test_miss_against_a_disk_index_relists_live():
+    names, calls = ["acct1"], []
+
+    def list_resources(**options):
+        calls.append(options)
+        return Pager([Resource(name) for name in names])
+
+    assert resource_index.lookup("storage_accounts", SUB, "acct1", list_resources)[0] == "rg1"
+    new_run()
+    names.append("acct2")
+
+    assert resource_index.lookup("storage_accounts", SUB, "acct2", list_resources) is not None
+    assert calls == [{}, {"arm_cache": False}]
+
+
+def test_new_account_is_found_through_the_cached_client(cache, arm, storage_client):
+    # The refresh goes through the same cached client the first listing did.
+    assert resource_index.lookup_storage_account(storage_client, SUB, "acct1")[0] == "rg1"
+    new_run()
+    arm.accounts.append("acct2")
+
+    found = resource_index.lookup_storage_account(storage_client, SUB, "ACCT2")
+    assert found == ("rg1", f"/subscriptions/{SUB}/resourceGroups/rg1/providers/Microsoft.Storage/storageAccounts/acct2")
+    assert len(arm.calls) == 2
+
+
+def test_resource_missing_from_arm_is_not_found(arm, storage_client):
+    assert resource_index.lookup_storage_account(storage_client, SUB, "nope") is None
+    new_run()
+    assert resource_index.lookup_storage_account(storage_client, SUB, "nope") is None
+    assert len(arm.calls) == 2  # Disk index, then one live re-listing
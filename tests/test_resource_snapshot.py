@@ -0,0 +1,104 @@
+import pandas as pd
+import pytest
+
+import pid_engine
+import resource_snapshot
+from conftest import SUB
+from pid_checks import CHECKS
+
+OTHER_SUB = "00000000-0000-0000-0000-000000000002"
+
+
+def snapshot_of(rows):
+    snapshot = pd.DataFrame(rows, columns=resource_snapshot.COLUMNS).astype("string")
+    snapshot["resource_type"] = snapshot["resource_type"].astype("category")
+    return snapshot
+
+
+# ---------------------
+# 🔗 resolve_rows
+# ---------------------
+def test_resolve_rows_tells_hits_from_both_kinds_of_miss():
+    snapshot = snapshot_of([
+        ("storage", SUB, "acct1", "rg1", "/id/acct1"),
+        ("storage", SUB, None, None, None),
+        ("keyvault", OTHER_SUB, "acct2", "rg9", "/id/vault"),
+        ("keyvault", OTHER_SUB, None, None, None),
+    ])
+
+    refs = resource_snapshot.resolve_rows(
+        snapshot, "storage",
+        [f" {SUB.upper()} ", SUB, OTHER_SUB],
+        ["ACCT1", "acct2", "acct2"],
+    )
+
+    assert refs == [("rg1", "/id/acct1"), False, None]
+
+
+def test_resolve_rows_keeps_input_order_and_repeats():
+    snapshot = snapshot_of([
+        ("storage", SUB, "a", "rg1", "/id/a"),
+        ("storage", SUB, "a", "rg1", "/id/a"),
+        ("storage", SUB, "b", "rg2", "/id/b"),
+        ("storage", SUB, None, None, None),
+    ])
+
+    refs = resource_snapshot.resolve_rows(snapshot, "storage", [SUB] * 3, ["b", "a", "b"])
+
+    assert refs == [("rg2", "/id/b"), ("rg1", "/id/a"), ("rg2", "/id/b")]
+
+
+# ---------------------
+# 📸 Snapshot build and engine fallback
+# ---------------------
+@pytest.fixture
+def engine_client(monkeypatch, storage_client):
+    monkeypatch.setattr(resource_snapshot, "get_client", lambda client_cls, sub_id=None: storage_client)
+    monkeypatch.setattr(pid_engine, "get_client", lambda client_cls, sub_id=None: storage_client)
+    return storage_client
+
+
+def test_snapshot_listing_reaches_arm_every_time(arm, engine_client):
+    first = resource_snapshot.list_resources(("storage", SUB))
+    arm.accounts.append("acct2")
+    second = resource_snapshot.list_resources(("storage", SUB))
+
+    assert [row[2] for row in first] == ["acct1", None]
+    assert [row[2] for row in second] == ["acct1", "acct2", None]
+    assert len(arm.calls) == 2
+
+
+@pytest.mark.usefixtures("fresh_index")
+def test_unlisted_subscription_falls_back_to_a_live_lookup(arm, engine_client):
+    entry = pid_engine.run_check(CHECKS["storage_account_public"], SUB, "acct1", ref=None)
+
+    assert entry["Status"] == "Success"
+    assert entry["Resource Group"] == "rg1"
+    assert len(arm.calls) == 2  # The listing, then the property GET
+
+
+@pytest.mark.usefixtures("fresh_index")
+def test_snapshot_hit_skips_the_lookup(arm, engine_client):
+    entry = pid_engine.run_check(CHECKS["storage_account_public"], SUB, "acct1", ref=("rg1", "/id/acct1"))
+
+    assert entry["Status"] == "Success"
+    assert len(arm.calls) == 1  # The property GET only, no listing
+    assert "/storageAccounts/acct1" in arm.calls[0]
+
+
+@pytest.mark.usefixtures("fresh_index")
+def test_snapshot_miss_is_not_found_without_any_call(arm, engine_client):
+    entry = pid_engine.run_check(CHECKS["storage_account_public"], SUB, "gone", ref=False)
+
+    assert entry["Status"] == "Failed"
+    assert entry["Message"] == "Storage Account not found"
+    assert arm.calls == []
+
+
+@pytest.mark.usefixtures("fresh_index")
+def test_resource_missing_from_a_live_lookup_fails(arm, engine_client):
+    entry = pid_engine.run_check(CHECKS["storage_account_public"], SUB, "gone", ref=None)
+
+    assert entry["Status"] == "Failed"
+    assert entry["Message"] == "Storage Account not found"
+    assert len(arm.calls) == 1
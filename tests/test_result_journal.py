@@ -0,0 +1,31 @@
+from result_journal import ResultJournal, journal_path
+
+
+def test_journal_path_follows_the_partial_file():
+    assert journal_path("keyvault_rbac_output_partial.xlsx") == "keyvault_rbac_output_partial.jsonl"
+
+
+def test_records_round_trip(tmp_path):
+    journal = ResultJournal(str(tmp_path / "run.jsonl"), fsync_every=2)
+    assert not journal.exists()
+
+    assert journal.append({"name": "a", "n": 1}) is False
+    assert journal.append({"name": "b", "n": 2}) is True  # Synced every 2 rows
+    journal.close()
+
+    assert journal.exists()
+    assert list(journal.read()) == [{"name": "a", "n": 1}, {"name": "b", "n": 2}]
+
+
+def test_half_written_line_is_skipped_and_sealed(tmp_path):
+    path = tmp_path / "run.jsonl"
+    path.write_text('{"name": "a"}\n{"name": "b", "St', encoding="utf-8")  # Crash mid-line
+
+    journal = ResultJournal(str(path))
+    assert list(journal.read()) == [{"name": "a"}]
+
+    journal.append({"name": "c"})  # Resumed run appends after the broken line
+    journal.close()
+
+    assert list(journal.read()) == [{"name": "a"}, {"name": "c"}]
+    assert path.read_text(encoding="utf-8").splitlines()[-1] == '{"name": "c"}'
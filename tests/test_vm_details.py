@@ -0,0 +1,19 @@
+import pandas as pd
+
+from VM_Details import ExcelRowSink
+
+
+def test_no_rows_means_no_workbook(tmp_path):
+    path = tmp_path / "vms.xlsx"
+    assert ExcelRowSink(str(path)).close() == 0
+    assert not path.exists()
+
+
+def test_rows_from_several_subscriptions_share_one_header(tmp_path):
+    path = tmp_path / "vms.xlsx"
+    sink = ExcelRowSink(str(path))
+    sink.write([{"Subscription ID": "a", "VM Name": "vm1"}])
+    sink.write([{"Subscription ID": "b", "VM Name": "vm2"}, {"Subscription ID": "b", "VM Name": "vm3"}])
+
+    assert sink.close() == 3
+    assert pd.read_excel(path).to_dict("list") == {"Subscription ID": ["a", "b", "b"], "VM Name": ["vm1", "vm2", "vm3"]}
@@ -1,6 +1,5 @@
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment
+from excel_writer import HEADER, TOP_LEFT, write_frame
 
 # Step 1: Read main CSV file
 csv_file_path = 'input_file.csv'  # Replace with your actual CSV file path
@@ -86,19 +85,8 @@ df.drop(columns=['Policy Statement', 'Policy Remediation'], inplace=True, errors
 print("\nUpdated Columns:")
 print(df.columns.tolist())
 
-# Step 8: Save to Excel
+# Step 8: Save to Excel as sheet 'Issues', top-left aligned as it is written
 excel_file_path = 'output_file.xlsx'
-df.to_excel(excel_file_path, index=False)
+write_frame(df, excel_file_path, "Issues", header_format={**HEADER, **TOP_LEFT}, cell_format=TOP_LEFT)
 
-# Step 9: Apply top-left alignment and rename sheet
-wb = load_workbook(excel_file_path)
-ws = wb.active
-ws.title = "Issues"  # Rename the sheet to 'Issues'
-
-alignment = Alignment(horizontal='left', vertical='top')
-for row in ws.iter_rows():
-    for cell in row:
-        cell.alignment = alignment
-
-wb.save(excel_file_path)
 print(f"\n✅ Excel file saved successfully with sheet name 'Issues': {excel_file_path}")
@@ -1,6 +1,5 @@
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment
+from excel_writer import HEADER, TOP_LEFT, write_frame
 import time
 
 start_time = time.time()
@@ -112,25 +111,12 @@ df['Col4'] = df['Col4'].fillna(env_msg)
 df.drop(columns=['Environment', 'Primary Contact'], inplace=True, errors='ignore')
 print(f"✅ Col3 & Col4 updated from 'Anex2' in {time.time() - step_start:.2f} seconds.")
 
-# Step 8: Save to Excel
+# Step 8: Save to Excel as sheet 'Issues', top-left aligned as it is written
 step_start = time.time()
 excel_file_path = 'output_file.xlsx'
-print(f"\n💾 Saving final Excel file: {excel_file_path}")
-df.to_excel(excel_file_path, index=False)
-print(f"✅ Excel file written in {time.time() - step_start:.2f} seconds.")
-
-# Step 9: Apply formatting and rename sheet
-step_start = time.time()
-print("\n🎨 Applying top-left alignment and renaming sheet to 'Issues'...")
-wb = load_workbook(excel_file_path)
-ws = wb.active
-ws.title = "Issues"
-alignment = Alignment(horizontal='left', vertical='top')
-for row in ws.iter_rows():
-    for cell in row:
-        cell.alignment = alignment
-wb.save(excel_file_path)
-print(f"✅ Formatting applied and saved in {time.time() - step_start:.2f} seconds.")
+print(f"\n💾 Saving final Excel file with top-left alignment to sheet 'Issues': {excel_file_path}")
+write_frame(df, excel_file_path, "Issues", header_format={**HEADER, **TOP_LEFT}, cell_format=TOP_LEFT)
+print(f"✅ Excel file written and formatted in {time.time() - step_start:.2f} seconds.")
 
 # Done!
 total_time = time.time() - start_time
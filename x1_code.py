@@ -1,8 +1,8 @@
 import pandas as pd
 import time
 import difflib
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment, Font, PatternFill
+from excel_writer import WRAP_TOP_LEFT, column_widths, write_frame
+from reference_cache import read_reference
 
 # === Configurable Inputs ===
 input_csv = "input_file.csv"
@@ -47,6 +47,8 @@ final_columns = [
     "VP / SVP / CVP", "BU", "Account", "Finding"
 ]
 
+header_format = {"bold": True, "bg_color": "#B7DEE8", **WRAP_TOP_LEFT}
+
 validation_checks = [
     {"name": "Subscription ID", "sheet": anex2_sheet, "join_column": "Subscription ID"},
     {"name": "Policy ID", "sheet": anex1_sheet, "join_column": "Policy ID"}
@@ -88,11 +90,20 @@ for col in columns_to_add:
     if col not in df.columns:
         df[col] = ""
 
+# Read every Anex sheet the steps below need in one pass over the workbook
+# (served from .reference_cache while the workbook is unchanged)
+try:
+    anex_sheets = read_reference(anex_file, [anex1_sheet, anex2_sheet, anex3_sheet],
+                                 key_columns=["Policy ID", "Subscription ID", primary_contact_column])
+except Exception as e:
+    print(f"❌ Error reading {anex_file}: {e}")
+    anex_sheets = {}
+
 # Step 6: Validation
 for check in validation_checks:
     try:
         print(f"\n🔍 Validating {check['name']} using sheet '{check['sheet']}'")
-        df_anex = pd.read_excel(anex_file, sheet_name=check["sheet"])
+        df_anex = anex_sheets[check["sheet"]].copy()
         df_anex[check["join_column"]] = df_anex[check["join_column"]].astype(str).str.strip()
         df[check["join_column"]] = df[check["join_column"]].astype(str).str.strip()
         unmatched = sorted(set(df[check["join_column"]]) - set(df_anex[check["join_column"]]))
@@ -109,7 +120,7 @@ for check in validation_checks:
 # Step 7: Map Description & Remediation
 df.drop(columns=["Policy Statement", "Policy Remediation"], inplace=True, errors="ignore")
 try:
-    df_remed = pd.read_excel(anex_file, sheet_name=anex1_sheet)
+    df_remed = anex_sheets[anex1_sheet].copy()
     df_remed["Policy ID"] = df_remed["Policy ID"].astype(str).str.strip()
     df = df.merge(df_remed[["Policy ID", "Policy Statement", "Policy Remediation"]], on="Policy ID", how="left")
     df["Description"] = df["Policy Statement"].fillna("Policy details not available")
@@ -122,7 +133,7 @@ except Exception as e:
 # Step 8: Map Environment & Primary Contact
 df.drop(columns=["Environment", primary_contact_column], inplace=True, errors="ignore")
 try:
-    df_env = pd.read_excel(anex_file, sheet_name=anex2_sheet)
+    df_env = anex_sheets[anex2_sheet].copy()
     df_env["Subscription ID"] = df_env["Subscription ID"].astype(str).str.strip()
     df = df.merge(df_env[["Subscription ID", "Environment", primary_contact_column]], on="Subscription ID", how="left")
     df["Environment"] = df["Environment"].fillna("Environment not available")
@@ -134,7 +145,7 @@ except Exception as e:
 # Step 9: Map Manager Hierarchy
 df.drop(columns=manager_columns, inplace=True, errors="ignore")
 try:
-    df_contact = pd.read_excel(anex_file, sheet_name=anex3_sheet)
+    df_contact = anex_sheets[anex3_sheet].copy()
     df_contact.columns = df_contact.columns.str.strip()
     missing_columns = [col for col in manager_columns if col not in df_contact.columns]
     if missing_columns:
@@ -149,31 +160,11 @@ except Exception as e:
 existing_final_cols = [col for col in final_columns if col in df.columns]
 df = df[existing_final_cols + [col for col in df.columns if col not in existing_final_cols]]
 
-# Step 11: Save to Excel with formatting
+# Step 11: Save to Excel with formatting (applied while writing)
 print("\n💾 Saving Excel file with formatting...")
 try:
-    df.to_excel(output_excel, index=False)
-    wb = load_workbook(output_excel)
-    ws = wb.active
-
-    align = Alignment(horizontal="left", vertical="top", wrap_text=True)
-    header_fill = PatternFill(start_color="B7DEE8", end_color="B7DEE8", fill_type="solid")
-    header_font = Font(bold=True)
-
-    for row in ws.iter_rows():
-        for cell in row:
-            cell.alignment = align
-
-    for cell in ws[1]:
-        cell.fill = header_fill
-        cell.font = header_font
-
-    ws.freeze_panes = "A2"
-    for col in ws.columns:
-        max_len = max(len(str(cell.value)) if cell.value else 0 for cell in col)
-        ws.column_dimensions[col[0].column_letter].width = min(max_len + 2, 60)
-
-    wb.save(output_excel)
+    write_frame(df, output_excel, header_format=header_format, cell_format=WRAP_TOP_LEFT,
+                widths=column_widths(df, max_width=60), freeze_header=True)
     print(f"✅ Final file saved with formatting: {output_excel}")
 except Exception as e:
     print(f"❌ Error formatting/saving Excel: {e}")
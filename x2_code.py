@@ -1,7 +1,8 @@
 import pandas as pd
 import time
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment, Font, PatternFill
+from pandas.api.extensions import take
+from excel_writer import WRAP_TOP_LEFT, SheetStreamWriter, column_widths, write_frame
+from reference_cache import read_reference
 
 # === Configurable Inputs ===
 input_csv = "input_file.csv"
@@ -14,6 +15,11 @@ ownership_file = "Ownership.xlsx"
 account_column_name = "Account"
 resource_column_name = "Affected Resource"
 parse_account_column = True
+chunk_size = None  # Stream the CSV this many rows at a time (None = load it whole); for multi-GB exports
+
+# Output formatting, applied while writing
+header_format = {"bold": True, "bg_color": "#B7DEE8", **WRAP_TOP_LEFT}
+cell_format = WRAP_TOP_LEFT
 
 primary_contact_column = "Primary Contact"
 manager_columns = [
@@ -51,6 +57,28 @@ def validate_required_columns(df, required_cols, source_name):
     else:
         print(f"✅ All required columns present in {source_name}")
 
+def build_lookup(df_ref, key, columns):
+    # Unique hashed index on the join key over the columns to map.
+    # The first row wins for a repeated key, so input rows are never duplicated.
+    return df_ref.drop_duplicates(subset=key).set_index(key)[columns]
+
+def map_dimension(df, key, lookup):
+    # One hash probe per input row: the key's position in the lookup index is
+    # computed once and reused for every mapped column, which is written in place.
+    # Returns the sorted keys that found no match, from the same probe.
+    positions = lookup.index.get_indexer(df[key])
+    for col in lookup.columns:
+        df[col] = take(lookup[col].to_numpy(), positions, allow_fill=True)
+    return sorted(set(df.loc[positions < 0, key]))
+
+def log_unmatched(values, path, label):
+    if values:
+        with open(path, "w") as f:
+            f.writelines(f"{v}\n" for v in values)
+        print(f"❌ {len(values)} unmatched {label} entries logged.")
+    else:
+        print(f"✅ All {label}s matched.")
+
 def format_duration(seconds):
     mins, secs = divmod(seconds, 60)
     hrs, mins = divmod(mins, 60)
@@ -58,86 +86,78 @@ def format_duration(seconds):
         f"{int(mins)}m {secs:.2f}s" if mins else f"{secs:.2f}s"
     )
 
-# === Start Script ===
-start_time = time.time()
-print("\n🚀 Starting preprocessing and validation...")
+def prepare_chunk(df):
+    # Steps 1-8 for one frame of input rows: the whole CSV, or one chunk of it.
+    df.columns = df.columns.str.strip()
+    df.rename(columns={
+        "Cloud provider": "Cloud Provider",
+        "Policy statement": "Policy Statement",
+        "Resource ID": "Affected Resource"
+    }, inplace=True)
+
+    # Step 2: Extract Subscription ID and Name from Account column
+    if parse_account_column and account_column_name in df.columns:
+        # As strings: a chunk whose accounts are all blank is read as float
+        accounts = df[account_column_name].astype(str)
+        df["Subscription ID"] = accounts.str.extract(r"^(\S+)\s*\(")[0].str.replace(r"\s+", "", regex=True)
+        df["Subscription Name"] = accounts.str.extract(r"\((.*?)\)")[0].str.replace(r"\s+", "", regex=True)
+
+    # Step 3: Extract filename from Affected Resource column
+    if resource_column_name in df.columns:
+        df[resource_column_name] = df[resource_column_name].apply(lambda x: str(x).split("/")[-1])
+
+    # Step 4: Drop unwanted columns
+    df.drop(columns=[col for col in columns_to_remove if col in df.columns], inplace=True)
+
+    # Step 5: Add any missing expected columns
+    for col in columns_to_add:
+        if col not in df.columns:
+            df[col] = ""
+
+    # Step 6: Map Environment and Primary Contact from Subscription File
+    df["Subscription ID"] = df["Subscription ID"].astype(str).str.strip()
+    unmatched_subs = map_dimension(df, "Subscription ID", sub_lookup)
+    df["Environment"] = df["Environment"].fillna("Environment not available")
+    df[primary_contact_column] = df[primary_contact_column].fillna("Primary contact not available")
 
-# Step 1: Load input CSV
-df = pd.read_csv(input_csv)
-print(f"✅ Loaded input file: {input_csv}")
-df.columns = df.columns.str.strip()
-df.rename(columns={
-    "Cloud provider": "Cloud Provider",
-    "Policy statement": "Policy Statement",
-    "Resource ID": "Affected Resource"
-}, inplace=True)
-
-# Step 2: Extract Subscription ID and Name from Account column
-if parse_account_column and account_column_name in df.columns:
-    print(f"🔧 Parsing Subscription ID and Name from '{account_column_name}'")
-    df["Subscription ID"] = df[account_column_name].str.extract(r"^(\S+)\s*\(")[0].str.replace(r"\s+", "", regex=True)
-    df["Subscription Name"] = df[account_column_name].str.extract(r"\((.*?)\)")[0].str.replace(r"\s+", "", regex=True)
+    # Step 7: Map Description, Policy Statement, and Policy Remediation
+    df["Policy ID"] = df["Policy ID"].astype(str).str.strip()
+    unmatched_policies = map_dimension(df, "Policy ID", remed_lookup)
 
-# Step 3: Extract filename from Affected Resource column
-if resource_column_name in df.columns:
-    df[resource_column_name] = df[resource_column_name].apply(lambda x: str(x).split("/")[-1])
+    # Step 8: Map Contact Hierarchy based on Primary Contact
+    map_dimension(df, primary_contact_column, contact_lookup)
 
-# Step 4: Drop unwanted columns
-df.drop(columns=[col for col in columns_to_remove if col in df.columns], inplace=True)
+    # Step 9: Reorder columns
+    ordered = [col for col in final_columns if col in df.columns]
+    df = df[ordered + [col for col in df.columns if col not in ordered]]
+    return df, unmatched_subs, unmatched_policies
 
-# Step 5: Add any missing expected columns
-for col in columns_to_add:
-    if col not in df.columns:
-        df[col] = ""
+# === Start Script ===
+start_time = time.time()
+print("\n🚀 Starting preprocessing and validation...")
 
-# Step 6: Merge Environment and Primary Contact from Subscription File
-df_sub = pd.read_excel(subscription_file)
+# Reference lookups, built once and shared by every chunk
+df_sub = read_reference(subscription_file, key_columns=["Subscription ID"])
 df_sub.columns = df_sub.columns.str.strip()
 validate_required_columns(df_sub, ["Subscription ID"], "Subscription File")
 
-# Ensure required columns exist before merging
+# Ensure required columns exist before mapping
 for col in ["Environment", primary_contact_column]:
     if col not in df_sub.columns:
         print(f"⚠️ Column '{col}' missing in Subscription File. Adding empty column.")
         df_sub[col] = None
 
-df["Subscription ID"] = df["Subscription ID"].astype(str).str.strip()
 df_sub["Subscription ID"] = df_sub["Subscription ID"].astype(str).str.strip()
+sub_lookup = build_lookup(df_sub, "Subscription ID", ["Environment", primary_contact_column])
 
-unmatched_subs = sorted(set(df["Subscription ID"]) - set(df_sub["Subscription ID"]))
-if unmatched_subs:
-    with open("unmatched_subscription_id.txt", "w") as f:
-        f.writelines(f"{s}\n" for s in unmatched_subs)
-    print(f"❌ {len(unmatched_subs)} unmatched Subscription ID entries logged.")
-else:
-    print("✅ All Subscription IDs matched.")
-
-df = df.merge(df_sub[["Subscription ID", "Environment", primary_contact_column]], on="Subscription ID", how="left")
-if "Environment" in df.columns:
-    df["Environment"] = df["Environment"].fillna("Environment not available")
-if primary_contact_column in df.columns:
-    df[primary_contact_column] = df[primary_contact_column].fillna("Primary contact not available")
-
-# Step 7: Merge Description, Policy Statement, and Policy Remediation
-df_remed = pd.read_excel(remediation_file)
+df_remed = read_reference(remediation_file, key_columns=["Policy ID"])
 df_remed.columns = df_remed.columns.str.strip()
 validate_required_columns(df_remed, ["Policy ID", "Description", "Policy Statement", "Policy Remediation"], "Remediation File")
 
-df["Policy ID"] = df["Policy ID"].astype(str).str.strip()
 df_remed["Policy ID"] = df_remed["Policy ID"].astype(str).str.strip()
+remed_lookup = build_lookup(df_remed, "Policy ID", ["Description", "Policy Statement", "Policy Remediation"])
 
-unmatched_policies = sorted(set(df["Policy ID"]) - set(df_remed["Policy ID"]))
-if unmatched_policies:
-    with open("unmatched_policy_id.txt", "w") as f:
-        f.writelines(f"{p}\n" for p in unmatched_policies)
-    print(f"❌ {len(unmatched_policies)} unmatched Policy ID entries logged.")
-else:
-    print("✅ All Policy IDs matched.")
-
-df = df.merge(df_remed[["Policy ID", "Description", "Policy Statement", "Policy Remediation"]], on="Policy ID", how="left")
-
-# Step 8: Merge Contact Hierarchy based on Primary Contact
-df_contact = pd.read_excel(ownership_file)
+df_contact = read_reference(ownership_file, key_columns=[primary_contact_column])
 df_contact.columns = df_contact.columns.str.strip()
 
 for col in [primary_contact_column] + manager_columns:
@@ -145,41 +165,41 @@ for col in [primary_contact_column] + manager_columns:
         print(f"⚠️ Column '{col}' missing in Ownership File. Adding empty column.")
         df_contact[col] = None
 
-if primary_contact_column not in df.columns:
-    print(f"⚠️ Column '{primary_contact_column}' missing in Input File. Adding empty column.")
-    df[primary_contact_column] = None
-
-df = df.merge(df_contact[[primary_contact_column] + manager_columns], on=primary_contact_column, how="left")
-print("✅ Mapped Manager Hierarchy and BU.")
-
-# Step 9: Reorder columns
-ordered = [col for col in final_columns if col in df.columns]
-df = df[ordered + [col for col in df.columns if col not in ordered]]
+contact_lookup = build_lookup(df_contact.dropna(subset=[primary_contact_column]), primary_contact_column, manager_columns)
 
-# Step 10: Write to Excel with formatting
-print("\n💾 Saving Excel file with formatting...")
-df.to_excel(output_excel, index=False)
-
-wb = load_workbook(output_excel)
-ws = wb.active
-
-align = Alignment(horizontal="left", vertical="top", wrap_text=True)
-header_fill = PatternFill(start_color="B7DEE8", end_color="B7DEE8", fill_type="solid")
-header_font = Font(bold=True)
-
-for row in ws.iter_rows():
-    for cell in row:
-        cell.alignment = align
-for cell in ws[1]:
-    cell.fill = header_fill
-    cell.font = header_font
+# Step 1: Load input CSV (whole, or streamed in chunks straight to the workbook)
+if parse_account_column:
+    print(f"🔧 Parsing Subscription ID and Name from '{account_column_name}'")
+if chunk_size:
+    print(f"🌊 Streaming {input_csv} in chunks of {chunk_size} rows")
+    unmatched_subs, unmatched_policies = set(), set()
+    with SheetStreamWriter(output_excel, "Sheet1", header_format=header_format, cell_format=cell_format,
+                           freeze_header=True) as writer:
+        for chunk in pd.read_csv(input_csv, chunksize=chunk_size):
+            df, chunk_subs, chunk_policies = prepare_chunk(chunk)
+            unmatched_subs.update(chunk_subs)
+            unmatched_policies.update(chunk_policies)
+            if writer.columns is None:
+                # Widths from the first chunk; later rows wrap within them
+                writer.widths = column_widths(df, max_width=60)
+            writer.write(df)
+            print(f"🌊 {writer.rows_written} rows written")
+    if len(writer.sheets) > 1:
+        print(f"📑 Output split over {len(writer.sheets)} sheets: {writer.sheets}")
+    unmatched_subs, unmatched_policies = sorted(unmatched_subs), sorted(unmatched_policies)
+else:
+    df, unmatched_subs, unmatched_policies = prepare_chunk(pd.read_csv(input_csv))
+print(f"✅ Loaded input file: {input_csv}")
 
-ws.freeze_panes = "A2"
-for col in ws.columns:
-    max_len = max(len(str(cell.value)) if cell.value else 0 for cell in col)
-    ws.column_dimensions[col[0].column_letter].width = min(max_len + 2, 60)
+log_unmatched(unmatched_subs, "unmatched_subscription_id.txt", "Subscription ID")
+log_unmatched(unmatched_policies, "unmatched_policy_id.txt", "Policy ID")
+print("✅ Mapped Manager Hierarchy and BU.")
 
-wb.save(output_excel)
+# Step 10: Write to Excel with formatting (the streamed workbook is already written)
+if not chunk_size:
+    print("\n💾 Saving Excel file with formatting...")
+    write_frame(df, output_excel, header_format=header_format, cell_format=cell_format,
+                widths=column_widths(df, max_width=60), freeze_header=True)
 print(f"✅ Final file saved as: {output_excel}")
 
 # Final run time
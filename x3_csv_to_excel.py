@@ -1,8 +1,7 @@
 import pandas as pd
 import time
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment, PatternFill
-from openpyxl.utils import get_column_letter
+from excel_writer import SKY_BLUE_HEADER, WRAP_TOP_LEFT, column_widths, write_frame
+from reference_cache import normalize_keys, read_reference
 
 # Start timer
 start_time = time.time()
@@ -21,9 +20,10 @@ unmatched_primary_contact_log_path = "unmatched_primary_contacts.txt"
 # Load input files
 print("📥 Loading input files...")
 df = pd.read_csv(input_file_path)
-remediation_df = pd.read_excel(remediation_file_path)
-subscription_df = pd.read_excel(subscription_details_path)
-ownership_df = pd.read_excel(ownership_file_path)
+# Reference workbooks come from the parsed-reference cache, key columns normalised
+remediation_df = read_reference(remediation_file_path, key_columns=['Policy ID'])
+subscription_df = read_reference(subscription_details_path, key_columns=['Subscription ID'])
+ownership_df = read_reference(ownership_file_path, key_columns=['Primary Contact'])
 print(f"🧾 Columns in input file: {list(df.columns)}")
 
 # Rename 'Policy statement' to 'Description'
@@ -53,6 +53,7 @@ if 'Resource ID' in df.columns:
 
 # Validate and merge remediation data
 print("🔍 Validating and merging 'Policy ID'...")
+df['Policy ID'] = normalize_keys(df['Policy ID'])
 input_policy_ids = set(df['Policy ID'].dropna())
 remediation_policy_ids = set(remediation_df['Policy ID'].dropna())
 unmatched = input_policy_ids - remediation_policy_ids
@@ -68,6 +69,7 @@ print("✅ Merged 'Policy Statement' and 'Policy Remediation'.")
 
 # Validate and merge subscription details
 print("🔍 Validating and merging 'Subscription ID'...")
+df['Subscription ID'] = normalize_keys(df['Subscription ID'])
 input_sub_ids = set(df['Subscription ID'].dropna())
 sub_ids = set(subscription_df['Subscription ID'].dropna())
 unmatched = input_sub_ids - sub_ids
@@ -83,6 +85,7 @@ print("✅ Merged 'Environment', 'BU', and 'Primary Contact'.")
 
 # Validate and merge ownership data
 print("🔍 Validating and merging 'Primary Contact'...")
+df['Primary Contact'] = normalize_keys(df['Primary Contact'])
 input_contacts = set(df['Primary Contact'].dropna())
 ownership_contacts = set(ownership_df['Primary Contact'].dropna())
 unmatched = input_contacts - ownership_contacts
@@ -125,33 +128,9 @@ if missing:
 df = df[[col for col in desired_order if col in df.columns]]
 print("📐 Columns rearranged in specified order.")
 
-# Save to Excel
-df.to_excel(output_excel_path, index=False)
-print(f"💾 Saved Excel before formatting: {output_excel_path}")
-
-# Format using openpyxl
-wb = load_workbook(output_excel_path)
-ws = wb.active
-ws.freeze_panes = "A2"
-
-alignment = Alignment(wrap_text=True, vertical='top', horizontal='left')
-header_fill = PatternFill(start_color="87CEEB", end_color="87CEEB", fill_type="solid")
-
-# Apply header formatting
-for cell in ws[1]:
-    cell.fill = header_fill
-    cell.alignment = alignment
-
-# Apply alignment and column width
-for col_idx, column_cells in enumerate(ws.columns, 1):
-    max_len = 0
-    for cell in column_cells:
-        cell.alignment = alignment
-        if cell.value:
-            max_len = max(max_len, len(str(cell.value)))
-    ws.column_dimensions[get_column_letter(col_idx)].width = min(max_len + 2, 50)
-
-wb.save(output_excel_path)
+# Save to Excel, formatted as it is written
+write_frame(df, output_excel_path, header_format={**SKY_BLUE_HEADER, **WRAP_TOP_LEFT}, cell_format=WRAP_TOP_LEFT,
+            widths=column_widths(df, max_width=50), freeze_header=True)
 print("🎨 Applied formatting: word wrap, alignment, header color, column width, freeze header.")
 print(f"✅ Final Excel file saved to: {output_excel_path}")
 